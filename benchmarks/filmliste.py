@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""Benchmark of loading the Filmliste (download, decompression, parsing and conversion to table rows).
+
+Serves a synthetic Filmliste (or a recorded one) from a local HTTP server and measures the rows per second
+of `Database._get_shows`, optionally compared with the module of another git revision. Run from the
+repository root:
+
+  python benchmarks/filmliste.py [--rows=<n>] [--file=<Filmliste-akt.xz>] [--processes=<n>] [<baseline revision>]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+from typing import Dict
+
+import fixtures
+
+sys.path.insert(0, fixtures.ROOT.as_posix())
+
+import mtv_dl  # noqa: E402
+
+
+def measure(module: Any, url: str, processes: int) -> float:
+    module.HIDE_PROGRESSBAR = True
+    database = module.Database.__new__(module.Database)
+    database.parse_processes = processes
+    start = time.perf_counter()
+    rows = sum(1 for _ in database._get_shows(url))
+    return rows / (time.perf_counter() - start)
+
+
+def main() -> None:
+    options, arguments = fixtures.parse_arguments(sys.argv[1:])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        if options.get('file'):
+            filmliste_path = Path(options['file']).absolute()
+        else:
+            rows = int(options.get('rows', 200000))
+            filmliste_path = fixtures.write_filmliste(temp_path / 'Filmliste-akt.xz', rows)
+            print(f'{rows} synthetic rows')
+        url = fixtures.serve(filmliste_path.parent) + '/' + filmliste_path.name
+
+        modules: Dict[str, ModuleType] = {'current': mtv_dl}
+        if arguments:
+            modules[arguments[0]] = fixtures.load_revision(arguments[0], temp_path)
+
+        for name, module in modules.items():
+            print(f'{name:<20} {measure(module, url, int(options.get("processes", 1))):>10.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
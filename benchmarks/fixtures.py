@@ -0,0 +1,161 @@
+# coding: utf-8
+
+"""Synthetic data and shared helpers for the benchmarks."""
+
+import functools
+import hashlib
+import http.server
+import importlib.util
+import json
+import lzma
+import random
+import subprocess
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+ROOT = Path(__file__).absolute().parent.parent
+
+# noinspection SpellCheckingInspection
+FILMLISTE_HEADER = ['Sender', 'Thema', 'Titel', 'Datum', 'Zeit', 'Dauer', 'Größe [MB]', 'Beschreibung', 'Url',
+                    'Website', 'Url Untertitel', 'Url RTMP', 'Url Klein', 'Url RTMP Klein', 'Url HD', 'Url RTMP HD',
+                    'DatumL', 'Url History', 'Geo', 'neu']
+
+CHANNELS = ['ARD', 'ZDF', '3Sat', 'ARTE.DE', 'BR', 'NDR', 'WDR', 'SWR', 'ORF', 'SRF']
+WORDS = ['Tatort', 'extra 3', 'Folge', 'Spezial', 'Krimi', 'Thriller', 'Doku', 'Nachrichten', 'Wetter', 'Sport',
+         'Ärger', 'Straße']
+
+
+def filmliste_records(rows: int, seed: int = 0, start: int = 1577836800) -> Iterator[List[str]]:
+    """Shows like in the Filmliste, channel and topic are only set when they change."""
+    rnd = random.Random(seed)
+    channel = topic = ''
+    for i in range(rows):
+        record_channel = record_topic = ''
+        if i % max(1, rows // len(CHANNELS)) == 0:
+            channel = record_channel = CHANNELS[(i * len(CHANNELS) // rows) % len(CHANNELS)]
+            topic = ''
+        if i % 20 == 0 or not topic:
+            topic = record_topic = '%s %d' % (' '.join(rnd.sample(WORDS, 2)), i // 20)
+        url = f'https://{channel.lower()}.example.org/video/{i}/{rnd.getrandbits(32):08x}_mid.mp4'
+        yield [record_channel,
+               record_topic,
+               '%s %d' % (' '.join(rnd.sample(WORDS, 3)), i),
+               '01.01.2020',
+               '20:15:00',
+               '%02d:%02d:%02d' % (rnd.randint(0, 2), rnd.randint(0, 59), rnd.randint(0, 59)),
+               str(rnd.randint(0, 2000)),
+               ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 60))),
+               url,
+               f'https://www.example.org/show/{i}',
+               '' if i % 3 else f'https://www.example.org/subtitles/{i}.xml',
+               '',
+               f'{len(url) - 8}|_low.mp4',
+               '',
+               f'{len(url) - 8}|_hd.mp4' if i % 4 else '',
+               '',
+               str(start + rnd.randint(0, 3 * 365 * 86400)),
+               '',
+               'DE-AT-CH' if i % 5 == 0 else '',
+               'true' if i % 50 == 0 else 'false']
+
+
+def write_records(path: Path, records: Iterable[List[str]]) -> Path:
+    """Write a compressed Filmliste with the given records."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with lzma.open(path.as_posix(), 'wt', encoding='utf-8') as fh:
+        fh.write('{"Filmliste":["01.01.2020, 10:00","01.01.2020, 09:00","3","MSearch [Vers.: 3.1.139]","0"]')
+        fh.write(',"Filmliste":' + json.dumps(FILMLISTE_HEADER, ensure_ascii=False))
+        for record in records:
+            fh.write(',"X":' + json.dumps(record, ensure_ascii=False))
+        fh.write('}')
+    return path
+
+
+def write_filmliste(path: Path, rows: int, seed: int = 0) -> Path:
+    """Write a compressed Filmliste with the given number of shows."""
+    return write_records(path, filmliste_records(rows, seed))
+
+
+def write_media(directory: Path, base_url: str, files: int = 4, size: int = 16 * 1024 * 1024,
+                segments: int = 100, segment_size: int = 256 * 1024) -> List[List[str]]:
+    """Write MP4 files and a HLS stream (master playlist, media playlist and segments) to the directory.
+
+    The files are expected to be served with the given base url, the Filmliste records of the shows are
+    returned (one per MP4 file and one for the stream)."""
+
+    directory.mkdir(parents=True, exist_ok=True)
+    urls = []
+    for i in range(files):
+        block = hashlib.sha256(b'show%d' % i).digest() * (64 * 1024 // 32)
+        with (directory / f'show{i}.mp4').open('wb') as fh:
+            for _ in range(size // len(block)):
+                fh.write(block)
+        urls.append(f'{base_url}/show{i}.mp4')
+
+    for i in range(segments):
+        (directory / f'segment{i}.ts').write_bytes(hashlib.sha256(b'segment%d' % i).digest() * (segment_size // 32))
+    (directory / 'stream.m3u8').write_text('#EXTM3U\n#EXT-X-TARGETDURATION:2\n'
+                                           + ''.join(f'#EXTINF:2.0,\nsegment{i}.ts\n' for i in range(segments))
+                                           + '#EXT-X-ENDLIST\n')
+    (directory / 'master.m3u8').write_text('#EXTM3U\n'
+                                           + ''.join(f'#EXT-X-STREAM-INF:BANDWIDTH={b},CODECS="avc1.4d401f"\n'
+                                                     f'stream.m3u8\n' for b in (1000000, 2000000, 4000000)))
+    urls.append(f'{base_url}/master.m3u8')
+
+    return [[CHANNELS[0] if i == 0 else '', 'Downloads' if i == 0 else '', f'Show {i}', '01.01.2020', '20:15:00',
+             '00:10:00', str(size // 1024 // 1024), 'Synthetic show', url, '', '', '', '', '', '', '',
+             str(1577836800 + i * 3600), '', '', 'false']
+            for i, url in enumerate(urls)]
+
+
+def serve(directory: Path) -> str:
+    """Serve the directory from a local HTTP server (running until the process ends), returns the base url."""
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *_args: object) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                             functools.partial(Handler, directory=directory.as_posix()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def parse_arguments(argv: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """Options (--<key>=<value>) and positional arguments of a benchmark."""
+    options: Dict[str, str] = {}
+    arguments = []
+    for argument in argv:
+        if argument.startswith('--'):
+            key, _, value = argument[2:].partition('=')
+            options[key] = value
+        else:
+            arguments.append(argument)
+    return options, arguments
+
+
+def revision_source(revision: str) -> bytes:
+    """Source of mtv_dl.py in another git revision."""
+    return subprocess.run(['git', 'show', f'{revision}:mtv_dl.py'],
+                          cwd=ROOT.as_posix(),
+                          stdout=subprocess.PIPE,
+                          check=True).stdout
+
+
+def load_revision(revision: str, directory: Path) -> ModuleType:
+    """Module mtv_dl of another git revision (imported as mtv_dl_baseline from the directory)."""
+    path = directory / 'mtv_dl_baseline.py'
+    path.write_bytes(revision_source(revision))
+    spec = importlib.util.spec_from_file_location('mtv_dl_baseline', path.as_posix())
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""Micro benchmark of the sqlite REGEXP function.
+
+Compares the initial implementation (compiling the expression for every row) with the current one on a
+synthetic show table. Run from the repository root:
+
+  python benchmarks/regexp.py [<rows>]
+"""
+
+import random
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import List
+
+sys.path.insert(0, Path(__file__).absolute().parent.parent.as_posix())
+
+import mtv_dl  # noqa: E402
+
+FILTERS = [
+    "channel REGEXP 'ARD'",
+    "topic REGEXP 'tatort'",
+    "title REGEXP 'extra 3'",
+    "title REGEXP '^Folge \\d+'",
+    "description REGEXP 'krimi|thriller'",
+    "title NOT REGEXP 'spezial'",
+    "url_http REGEXP NULL",
+]
+
+
+def old_regexp(expr: str, item: str) -> bool:
+    return re.compile(expr, re.IGNORECASE).search(item) is not None
+
+
+def create_table(rows: int) -> sqlite3.Connection:
+    rnd = random.Random(0)
+    words = ['Tatort', 'extra 3', 'Folge', 'Spezial', 'Krimi', 'Thriller', 'Doku', 'Nachrichten', 'Wetter', 'Sport']
+    channels = ['ARD', 'ZDF', '3Sat', 'ARTE.DE', 'BR', 'NDR', 'WDR', 'SWR', 'ORF', 'SRF']
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE show (channel TEXT, topic TEXT, title TEXT, description TEXT, url_http TEXT)")
+    connection.executemany("INSERT INTO show VALUES (?, ?, ?, ?, ?)", (
+        (rnd.choice(channels),
+         ' '.join(rnd.sample(words, 2)),
+         '%s %d' % (' '.join(rnd.sample(words, 3)), i),
+         ' '.join(rnd.choice(words) for _ in range(30)),
+         None if i % 10 == 0 else 'https://example.org/%d.mp4' % i)
+        for i in range(rows)))
+    return connection
+
+
+def measure(connection: sqlite3.Connection, function: Callable[[Any, Any], bool]) -> List[float]:
+    connection.create_function("REGEXP", 2, function)
+    timings = []
+    for where in FILTERS:
+        start = time.perf_counter()
+        try:
+            connection.execute(f"SELECT count(*) FROM show WHERE {where}").fetchone()
+        except sqlite3.OperationalError:
+            timings.append(float('nan'))
+        else:
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    connection = create_table(rows)
+    old_timings = measure(connection, old_regexp)
+    new_timings = measure(connection, mtv_dl.sqlite_regexp)
+    print(f'{rows} rows')
+    print(f'{"filter":<40} {"old [s]":>10} {"new [s]":>10}')
+    for where, old, new in zip(FILTERS, old_timings, new_timings):
+        print(f'{where:<40} {old:>10.3f} {new:>10.3f}')
+    print(f'{"total":<40} {sum(t for t in old_timings if t == t):>10.3f} {sum(new_timings):>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""Startup benchmark of mtv_dl.
+
+Measures the import time of the module (`python -X importtime`) in fresh interpreters, optionally compared
+with the module of another git revision. The byte code is cached before measuring, like for an installed
+package. Run from the repository root:
+
+  python benchmarks/startup.py [--runs=<n>] [<baseline revision>]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import fixtures
+
+ROOT = fixtures.ROOT
+
+
+def import_times(module_dir: Path) -> Dict[str, Tuple[int, int]]:
+    """Self and cumulative import time in µs of every module imported by mtv_dl."""
+    python_path = os.pathsep.join(filter(None, [module_dir.as_posix(), os.environ.get('PYTHONPATH')]))
+    env = dict(os.environ, PYTHONPATH=python_path)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import mtv_dl'],
+                            cwd=module_dir.as_posix(),
+                            env=env,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True,
+                            check=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            self_time, cumulative, name = line[len('import time:'):].split('|')
+            if self_time.strip().isdigit():
+                times[name.strip()] = (int(self_time), int(cumulative))
+    return times
+
+
+def measure(module_dir: Path, runs: int) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    import_times(module_dir)  # write the byte code
+    samples: List[Dict[str, Tuple[int, int]]] = [import_times(module_dir) for _ in range(runs)]
+    return statistics.median(s['mtv_dl'][1] for s in samples) / 1000, samples[-1]
+
+
+def main() -> None:
+    arguments = sys.argv[1:]
+    runs = 20
+    for argument in list(arguments):
+        if argument.startswith('--runs='):
+            runs = int(argument.split('=', 1)[1])
+            arguments.remove(argument)
+
+    current, current_times = measure(ROOT, runs)
+    print(f'{"current":<20} {current:>8.1f} ms')
+
+    if arguments:
+        revision = arguments[0]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / 'mtv_dl.py').write_bytes(fixtures.revision_source(revision))
+            baseline, _ = measure(Path(temp_dir), runs)
+        print(f'{revision:<20} {baseline:>8.1f} ms')
+
+    print()
+    print('slowest imports (cumulative):')
+    for name, (_, cumulative) in sorted(current_times.items(), key=lambda t: -t[1][1])[1:11]:
+        print(f'  {name:<30} {cumulative / 1000:>8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
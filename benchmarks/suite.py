@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""Benchmark suite of mtv_dl.
+
+Generates a synthetic Filmliste and media files (MP4 files and a HLS stream), serves them from a local HTTP
+server and times the main stages: importing the list (`Database.initialize_filmliste`), filtering with
+typical rule sets (`Database.filtered`), the output of the list and dump commands and downloading shows
+(`Downloader.download`). The results are written as JSON (median and single runs in seconds), optionally
+together with those of the module of another git revision. Run from the repository root:
+
+  python benchmarks/suite.py [--rows=<n>] [--runs=<n>] [--output=<file>] [<baseline revision>]
+
+Stages an older revision lacks are recorded as unsupported, failing stages as failed (the exit status is 1 then).
+"""
+
+import contextlib
+import io
+import json
+import logging
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import fixtures
+
+sys.path.insert(0, fixtures.ROOT.as_posix())
+
+import mtv_dl  # noqa: E402
+
+FILTERS = {
+    'channel': ['channel=ARD'],
+    'topic and duration': ['topic=tatort', 'duration+30m'],
+    'title regexp': ['title=^(Tatort|Folge) .* \\d+$'],
+    'description': ['description=krimi'],
+    'words': ['title~Krimi'],
+    'day and hour': ['dow=3', 'hour=20'],
+    'start': ['start+2021-01-01', 'start-2021-07-01'],
+}
+OUTPUT_FILTER = ['channel=ARD']
+QUALITY = ('url_http', 'url_http_hd', 'url_http_small')
+TARGET = '{dir}/{channel}/{topic}/{start} {title}{ext}'
+
+# attributes of the module a stage needs, older revisions without them skip the stage
+REQUIREMENTS = {
+    'filtered: words': 'Database._word_search_condition',
+}
+
+
+def supports(module: Any, stage: str) -> bool:
+    if stage not in REQUIREMENTS:
+        return True
+    target = module
+    for name in REQUIREMENTS[stage].split('.'):
+        if not hasattr(target, name):
+            return False
+        target = getattr(target, name)
+    return True
+
+
+def timed(function: Callable[[], Any], runs: int, **details: Any) -> Dict[str, Any]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return dict(details, seconds=statistics.median(samples), runs=samples)
+
+
+def measure(module: Any,
+            results: Dict[str, Dict[str, Any]],
+            stage: str,
+            function: Callable[[], Any],
+            runs: int,
+            details: Callable[[], Dict[str, Any]] = dict) -> None:
+    """Time a stage. Stages the module lacks (e.g. a filter of an older revision) are recorded as unsupported,
+    a stage raising an error as failed, the suite continues with the next one in both cases."""
+    if not supports(module, stage):
+        results[stage] = {'unsupported': f'requires {REQUIREMENTS[stage]}'}
+        return
+    try:
+        results[stage] = timed(function, runs, **details())
+    except Exception as e:
+        results[stage] = {'failed': f'{type(e).__name__}: {e}'}
+
+
+def run_suite(module: Any, base_url: str, media_size: int, work_dir: Path, runs: int) -> Dict[str, Dict[str, Any]]:
+    module.HIDE_PROGRESSBAR = True
+    results: Dict[str, Dict[str, Any]] = {}
+    for directory in ('list', 'media'):
+        (work_dir / directory).mkdir(parents=True)
+
+    module.FILMLISTE_URL = base_url + '/Filmliste-akt.xz'
+    database = module.Database(filmliste=work_dir / 'list' / module.FILMLISTE_DATABASE_FILE,
+                               history=work_dir / 'list' / module.HISTORY_DATABASE_FILE)
+    rows = sum(1 for _ in database.filtered([], include_future=True))
+    measure(module, results, 'initialize_filmliste', database.initialize_filmliste, runs,
+            lambda: dict(rows=rows))
+
+    for name, rules in FILTERS.items():
+        def count(rules: List[str] = rules) -> int:
+            return sum(1 for _ in database.filtered(rules))
+        measure(module, results, f'filtered: {name}', count, runs, lambda: dict(rules=rules, rows=count()))
+
+    # the output is written to memory, the console isn't part of the measurement
+    shows = list(database.filtered(OUTPUT_FILTER))
+
+    def output(function: Callable[[List[Any]], None]) -> Callable[[], None]:
+        def run() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                function(shows)
+        return run
+
+    measure(module, results, 'show_table', output(module.show_table), runs, lambda: dict(rows=len(shows)))
+    dump_shows = getattr(module, 'dump_shows', None) or (lambda s: print(
+        json.dumps(list(s), default=module.serialize_for_json, indent=4, sort_keys=True)))
+    measure(module, results, 'dump', output(dump_shows), runs, lambda: dict(rows=len(shows)))
+
+    module.FILMLISTE_URL = base_url + '/media/Filmliste-akt.xz'
+    media_database = module.Database(filmliste=work_dir / 'media' / module.FILMLISTE_DATABASE_FILE,
+                                     history=work_dir / 'media' / module.HISTORY_DATABASE_FILE)
+    items = list(media_database.filtered([], include_future=True))
+
+    def download() -> None:
+        download_dir = work_dir / 'downloads'
+        download_dir.mkdir()
+        try:
+            for item in items:
+                assert module.Downloader(item).download(QUALITY, download_dir, Path(TARGET),
+                                                        include_subtitles=False)
+        finally:
+            shutil.rmtree(download_dir.as_posix())
+
+    measure(module, results, 'download', download, runs, lambda: dict(shows=len(items), bytes=media_size))
+
+    database.connection.close()
+    media_database.connection.close()
+    return results
+
+
+def main() -> None:
+    options, arguments = fixtures.parse_arguments(sys.argv[1:])
+    rows = int(options.get('rows', 50000))
+    runs = int(options.get('runs', 3))
+    logging.getLogger('mtv_dl').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        served = temp_path / 'served'
+        served.mkdir()
+        base_url = fixtures.serve(served)
+        fixtures.write_filmliste(served / 'Filmliste-akt.xz', rows)
+        fixtures.write_records(served / 'media' / 'Filmliste-akt.xz',
+                               fixtures.write_media(served / 'media', base_url + '/media'))
+        media_size = sum(f.stat().st_size for f in (served / 'media').iterdir() if f.suffix in ('.mp4', '.ts'))
+
+        modules: Dict[str, ModuleType] = {'current': mtv_dl}
+        if arguments:
+            modules[arguments[0]] = fixtures.load_revision(arguments[0], temp_path)
+
+        results = {}
+        failed = False
+        for name, module in modules.items():
+            results[name] = run_suite(module, base_url, media_size, temp_path / name.replace('/', '_'), runs)
+            for stage, result in results[name].items():
+                if 'unsupported' in result:
+                    print(f'{name:<20} {stage:<30} unsupported ({result["unsupported"]})', file=sys.stderr)
+                elif 'failed' in result:
+                    print(f'{name:<20} {stage:<30} FAILED ({result["failed"]})', file=sys.stderr)
+                    failed = True
+                else:
+                    print(f'{name:<20} {stage:<30} {result["seconds"]:>8.3f} s', file=sys.stderr)
+
+    report = json.dumps({'python': platform.python_version(),
+                         'sqlite': sqlite3.sqlite_version,
+                         'rows': rows,
+                         'runs': runs,
+                         'results': results}, indent=4)
+    if options.get('output'):
+        Path(options['output']).write_text(report + '\n')
+    else:
+        print(report)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
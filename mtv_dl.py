@@ -5,10 +5,10 @@
 """MediathekView-Commandline-Downloader
 
 Usage:
-  {cmd} list [options] [--sets=<file>] [--count=<results>] [<filter>...]
-  {cmd} dump [options] [--sets=<file>] [<filter>...]
+  {cmd} list [options] [--sets=<file>] [--count=<results>] [--fields=<names>] [--tsv] [<filter>...]
+  {cmd} dump [options] [--sets=<file>] [--fields=<names>] [--ndjson] [<filter>...]
   {cmd} download [options] [--sets=<file>] [--low|--high] [<filter>...]
-  {cmd} history [options] [--reset|--remove=<hash>]
+  {cmd} history [options] [--reset|--remove=<hash>|--tsv]
   {cmd} --help
 
 Commands:
@@ -24,10 +24,31 @@ Options:
   -l <path>, --logfile=<path>           Log messages to a file instead of stdout.
   -r <hours>, --refresh-after=<hours>   Update database if it is older then the given
                                         number of hours. [default: 3]
+  --full-refresh-after=<hours>          Updates only apply the (much smaller) list of changed
+                                        shows, unless the last full update is older then the
+                                        given number of hours. [default: 24]
   -d <path>, --dir=<path>               Directory to put the databases in (default is
                                         the current working directory).
   --include-future                      Include shows that have not yet started.
+  --parse-processes=<count>             Number of processes to parse the list of shows with
+                                        (0 is one per CPU). [default: 1]
+  --snapshot                            Keep a columnar copy of the database to answer most
+                                        filters (all but those on 'start' and the '~' operator)
+                                        without the database.
+  --database-profile=<name>             Settings of the database: 'fast' (less disk syncs while
+                                        the list of shows is imported, memory mapped reads),
+                                        'safe' (sqlite defaults, for unreliable power supplies)
+                                        or 'nas' (no write ahead log, for network file systems).
+                                        [default: fast]
   --config=<path>                       Path to the config file.
+  --retries=<count>                     Number of retries of a request failing for temporary
+                                        reasons (timeouts, resets, server errors). [default: 5]
+  --retry-delay=<seconds>               Delay before the first retry, doubled for every further
+                                        one. [default: 2]
+  --limit-rate=<rate>                   Limit the download rate of all transfers together to the
+                                        given bytes per second (e.g. 500k or 2M). Different rates
+                                        for times of the day can be added, e.g. 2M,01:00-06:00=0
+                                        (0 is unlimited).
 
 Hooks:
   --post-download=<path>                Programm to run after a download has finished.
@@ -38,6 +59,17 @@ Hooks:
 
 List options:
   -c <results>, --count=<results>       Limit the number of results. [default: 50]
+  --fields=<names>                      Comma separated fields to show (also for dump), e.g.
+                                        channel,title,start. Available are hash, channel, title,
+                                        topic, description, region, size, start, duration, age,
+                                        website, new, url_http, url_http_hd, url_http_small,
+                                        url_subtitles, downloaded and sets (see --single-pass).
+  --tsv                                 Write tab separated values (with a header line) instead
+                                        of a table (also for the history).
+
+Dump options:
+  --ndjson                              Write every show as a json object on a line of its own
+                                        (newline delimited json) instead of a json list.
 
 History options:
   --reset                               Reset the list of downloaded shows.
@@ -58,6 +90,18 @@ Download options:
   --mark-only                           Do not download any show, but mark it as downloaded
                                         in the history. This is to initialize a new filter
                                         if upcoming shows are wanted.
+  -p <count>, --parallel=<count>        Number of shows to download at the same time. [default: 1]
+  --parallel-per-host=<count>           Maximal number of shows downloaded at the same time from
+                                        the same server (the segments and parts of a show are
+                                        not counted separately). [default: 2]
+  --parallel-segments=<count>           Number of segments of a HLS stream to download at the
+                                        same time. [default: 4]
+  --connections=<count>                 Number of connections to download a single large file
+                                        with (if the server supports it). [default: 1]
+  --min-part-size=<MiB>                 Minimal size of the parts requested on every connection.
+                                        [default: 8]
+  --split-threshold=<MiB>               Files smaller than this are downloaded with a single
+                                        connection. [default: 64]
   --no-subtitles                        Do not try to download subtitles.
   --no-nfo                              Do not nfo files.
   --set-file-mod-time                   Sets the file modification time of the downloaded show to
@@ -65,10 +109,16 @@ Download options:
   -s <file>, --sets=<file>              A file to load different sets of filters (see below
                                         for details). In the file every different filter set
                                         is expected to be on a new line.
+  --single-pass                         Select the shows of all filter sets with a single database
+                                        query. Every show is listed only once, together with the
+                                        numbers of the filter sets it matched (field 'sets').
 
   WARNING: Please be aware that ancient RTMP streams are not supported
            They will not even get listed.
 
+  Failed downloads are resumed with the next run (as long as the server supports it). The
+  partial files are kept in the directory .Partial (see --dir) for up to a week.
+
 Filters:
 
   Use filter to select only the shows wanted. Syntax is always <field><operator><pattern>.
@@ -82,6 +132,12 @@ Filters:
 
    '!=' Inverse of the '=' operator.
 
+   '~'  Pattern is a word or phrase (multiple words) to search for in the fields 'description',
+        'topic' and 'title'. A trailing '*' matches all words starting with the pattern. This
+        is answered from a full text index and much faster than the '=' operator.
+
+   '!~' Inverse of the '~' operator.
+
    '+'  Pattern must be greater then the field value. Available for the fields 'duration',
         'age', 'start', 'dow' (day of the week), 'hour', 'minute', and 'size'.
 
@@ -95,6 +151,7 @@ Filters:
   Examples:
     - topic='extra 3'                   (topic contains 'extra 3')
     - title!=spezial                    (title not contains 'spezial')
+    - title~'extra 3'                   (title contains the words 'extra 3')
     - channel=ARD                       (channel contains ARD)
     - age-1mm                           (age is younger then 1 month)
     - duration+20m                      (duration longer then 20 min)
@@ -122,7 +179,8 @@ Filter sets:
 
   If additional filters where given through the commandline, all filter sets are extended
   by these filters. Be aware that this is not faster then running all queries separately
-  but just more comfortable.
+  but just more comfortable, unless --single-pass is given. With --single-pass the result
+  limit (--count) applies to all sets together instead of every single set.
 
 Config file:
 
@@ -142,62 +200,99 @@ Config file:
 
 import codecs
 import hashlib
-import http.client
 import json
 import logging
 import lzma
+import mmap
+import operator
 import os
+import queue
+import random
 import re
 import shlex
 import shutil
+import socket
 import sqlite3
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import urllib.error
 import urllib.parse
-import urllib.request
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from contextlib import ExitStack
 from contextlib import contextmanager
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
-from io import BytesIO
+from functools import lru_cache
+from functools import partial
+from itertools import accumulate
 from itertools import chain
+from itertools import compress
+from itertools import islice
 from pathlib import Path
 from textwrap import fill as wrap
 from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Deque
 from typing import Dict
 from typing import Iterable
 from typing import Iterator
 from typing import List
+from typing import TYPE_CHECKING
 from typing import Optional
 from typing import Tuple
+from typing import TypeVar
 from typing import Union
-from xml.etree import ElementTree as ET
 
 import docopt
-import durationpy
-import iso8601
-import rfc6266
-import tzlocal
-import yaml
-from bs4 import BeautifulSoup
-from pydash import py_
-from rich import box
-from rich.console import Console
-from rich.logging import RichHandler
-from rich.progress import BarColumn
-from rich.progress import Progress
-from rich.progress import TextColumn
-from rich.progress import TimeRemainingColumn
-from rich.table import Table
 from typing_extensions import Literal
 from typing_extensions import TypedDict
-from yaml.error import YAMLError
+
+# everything else is imported where it is needed, most calls only use a fraction of it
+if TYPE_CHECKING:
+    import http.client
+
+    from rich.console import Console
+    from rich.progress import Progress
+    from rich.progress import TaskID
 
 CHUNK_SIZE = 128 * 1024
+READ_AHEAD_CHUNKS = 16
+PARSE_CHUNK_SIZE = 4 * 1024 * 1024
+INSERT_BATCH_SIZE = 5000
+REGEXP_CACHE_SIZE = 256
+FORMAT_CACHE_SIZE = 4096
+TABLE_PAGE_SIZE = 1000
+DOWNLOADS_PER_HOST = 2
+PARALLEL_SEGMENTS = 4
+CONNECTIONS_PER_FILE = 1
+MIN_PART_SIZE = 8 * 1024 * 1024
+SPLIT_THRESHOLD = 64 * 1024 * 1024
+RETRIES = 5
+RETRY_DELAY = 2.0
+RETRY_MAX_DELAY = 120.0
+PARTIAL_DOWNLOADS_MAX_AGE = timedelta(days=7)
+EPOCH = datetime(1970, 1, 1)
+
+# journal mode and memory map size of the show database, pragmas changed while the list of shows is imported
+DATABASE_PROFILES: Dict[str, Tuple[str, int, Dict[str, Union[str, int]]]] = {
+    'fast': ('WAL', 256 * 1024 * 1024, {'main.synchronous': 'OFF',
+                                        'main.cache_size': -64 * 1024,
+                                        'temp_store': 'MEMORY'}),
+    'safe': ('WAL', 0, {}),
+    'nas': ('DELETE', 0, {}),
+}
 
 HIDE_PROGRESSBAR = True
 DEFAULT_CONFIG_FILE = Path('~/.mtv_dl.yml')
@@ -206,30 +301,67 @@ CONFIG_OPTIONS = {
     'dir': str,
     'high': bool,
     'include-future': bool,
+    'ndjson': bool,
+    'tsv': bool,
+    'fields': str,
+    'parse-processes': int,
+    'snapshot': bool,
+    'database-profile': str,
     'logfile': str,
     'low': bool,
     'no-bar': bool,
     'no-subtitles': bool,
+    'parallel': int,
+    'parallel-per-host': int,
+    'parallel-segments': int,
+    'connections': int,
+    'min-part-size': int,
+    'split-threshold': int,
+    'retries': int,
+    'retry-delay': int,
+    'limit-rate': str,
     'set-file-mod-time': bool,
+    'single-pass': bool,
     'quiet': bool,
     'refresh-after': int,
+    'full-refresh-after': int,
     'target': str,
     'verbose': bool,
     'post-download': str,
 }
 
+TABLE_HEADERS = [
+    'hash',
+    'channel',
+    'title',
+    'topic',
+    'size',
+    'start',
+    'duration',
+    'age',
+    'region',
+    'downloaded',
+]
+
 HISTORY_DATABASE_FILE = '.History.sqlite'
+PARTIAL_DOWNLOADS_DIRECTORY = '.Partial'
 FILMLISTE_DATABASE_FILE = '.Filmliste.{script_version}.sqlite'
 
+# regex to find characters with a special meaning in regular expressions
+REGEXP_SPECIAL_CHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# regex to find characters breaking the lines or columns of tab separated values
+TSV_SPECIAL_CHARACTERS = re.compile(r'[\t\r\n]')
+
 # regex to find characters not allowed in file names
 INVALID_FILENAME_CHARACTERS = re.compile("[{}]".format(re.escape('<>:"/\\|?*' + "".join(chr(i) for i in range(32)))))
 
 # see https://res.mediathekview.de/akt.xml
 # and https://forum.mediathekview.de/topic/3508/aktuelle-verteiler-und-filmlisten-server
 FILMLISTE_URL = "https://liste.mediathekview.de/Filmliste-akt.xz"
+FILMLISTE_DIFF_URL = "https://liste.mediathekview.de/Filmliste-diff.xz"
 
 logger = logging.getLogger('mtv_dl')
-local_zone = tzlocal.get_localzone()
 utc_zone = timezone.utc
 now = datetime.now(tz=utc_zone).replace(second=0, microsecond=0)
 
@@ -238,13 +370,60 @@ now = datetime.now(tz=utc_zone).replace(second=0, microsecond=0)
 sqlite3.register_adapter(timedelta, lambda v: v.total_seconds())
 sqlite3.register_converter("timedelta", lambda v: timedelta(seconds=int(v)))
 
-# console handler for tables and progress bars
-console = Console()
+
+# progress display used by all progress bars while downloading shows in parallel
+shared_progress: Optional["Progress"] = None
+
+# set to stop all running downloads
+abort_downloads = threading.Event()
+
+# serializes positional writes on platforms without os.pwrite
+positional_write_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def local_zone() -> Any:
+    import tzlocal
+    return tzlocal.get_localzone()
+
+
+@lru_cache(maxsize=None)
+def get_console() -> "Console":
+    """Console for tables, progress bars and log messages."""
+    from rich.console import Console
+    return Console()
+
+
+class ConsoleLogHandler(logging.Handler):
+    """Log handler for the console, rich is set up with the first message."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._handler: Optional[logging.Handler] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handler is None:
+            from rich.logging import RichHandler
+            rich_handler = RichHandler(console=get_console())
+            rich_handler.setFormatter(self.formatter)
+            rich_handler._log_render.show_path = False
+            self._handler = rich_handler
+        self._handler.emit(record)
 
 
 @contextmanager
-def progress_bar() -> Iterator[Progress]:
-    progress_console = console
+def progress_bar() -> Iterator["Progress"]:
+    if shared_progress is not None:
+        yield shared_progress
+        return
+
+    from rich.console import Console
+    from rich.progress import BarColumn
+    from rich.progress import Progress
+    from rich.progress import TextColumn
+    from rich.progress import TimeRemainingColumn
+
+    progress_console = get_console()
     if HIDE_PROGRESSBAR:
         progress_console = Console(file=open(os.devnull, 'w'))
     with Progress(TextColumn("[bold blue]{task.description}", justify="right"),
@@ -256,13 +435,29 @@ def progress_bar() -> Iterator[Progress]:
         yield progress
 
 
+@contextmanager
+def shared_progress_bar() -> Iterator["Progress"]:
+    global shared_progress
+    with progress_bar() as progress:
+        shared_progress = progress
+        try:
+            yield progress
+        finally:
+            shared_progress = None
+
+
 class ConfigurationError(Exception):
     pass
 
+
 class RetryLimitExceeded(Exception):
     pass
 
 
+class DatabaseLocked(Exception):
+    pass
+
+
 def serialize_for_json(obj: Any) -> str:
     if isinstance(obj, datetime):
         return obj.isoformat()
@@ -272,10 +467,478 @@ def serialize_for_json(obj: Any) -> str:
         raise TypeError('%r is not JSON serializable' % obj)
 
 
+def write_at(fd: int, data: bytes, position: int) -> None:
+    """Write the data to the given position of the file (safe to use from several threads)."""
+    if hasattr(os, 'pwrite'):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, position)
+            view, position = view[written:], position + written
+    else:
+        with positional_write_lock:
+            os.lseek(fd, position, os.SEEK_SET)
+            os.write(fd, data)
+
+
 def escape_path(s: str) -> str:
     return INVALID_FILENAME_CHARACTERS.sub("_", s)
 
 
+def parse_content_disposition(content_disposition: Optional[str], location: Optional[str]) -> Optional[str]:
+    """Returns the file name proposed by the server, if any."""
+    import rfc6266
+
+    # rfc6266 logger fix (don't expect an upstream fix for that)
+    for logging_handler in rfc6266.LOGGER.handlers:
+        rfc6266.LOGGER.removeHandler(logging_handler)
+
+    file_name: Optional[str] = rfc6266.parse_headers(content_disposition=content_disposition,
+                                                     location=location).filename_unsafe
+    return file_name
+
+
+class HostLimiter:
+    """Limits the number of shows downloaded at the same time from the same host.
+
+    A slot is held for the whole download of a show, the segments and parts requested for it in parallel
+    share that slot."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urllib.parse.urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.limit))
+        with semaphore:
+            yield
+
+
+host_limiter = HostLimiter(DOWNLOADS_PER_HOST)
+
+
+class RateLimiter:
+    """Token bucket limiting the throughput of all transfers together.
+
+    The rate may depend on the time of day, e.g. '1M,01:00-06:00=0' limits the transfers to 1 MiB/s
+    except for the night (0 is unlimited)."""
+
+    def __init__(self) -> None:
+        self.rate = 0.0
+        self.schedule: List[Tuple[int, int, float]] = []
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    @staticmethod
+    def _parse_rate(rate: str) -> float:
+        match = re.match(r'^(\d+(?:\.\d+)?)([kmg]?)$', rate.strip(), re.IGNORECASE)
+        if not match:
+            raise ConfigurationError(f'Invalid rate {rate!r} (expected bytes per second, e.g. 500k or 2M).')
+        return float(match.group(1)) * 1024.0 ** ' kmg'.index(match.group(2).lower() or ' ')
+
+    def configure(self, definition: Optional[str]) -> None:
+        self.rate, self.schedule = 0.0, []
+        if not definition:
+            return
+        for rule in definition.split(','):
+            if '=' not in rule:
+                self.rate = self._parse_rate(rule)
+                continue
+            period, rate = rule.split('=', 1)
+            match = re.match(r'^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$', period.strip())
+            if not match:
+                raise ConfigurationError(f'Invalid time of day {period!r} (expected e.g. 01:00-06:00).')
+            start_hour, start_minute, end_hour, end_minute = (int(g) for g in match.groups())
+            if max(start_hour, end_hour) > 23 or max(start_minute, end_minute) > 59:
+                raise ConfigurationError(f'Invalid time of day {period!r} (hours 0-23 and minutes 0-59 expected).')
+            self.schedule.append((start_hour * 60 + start_minute, end_hour * 60 + end_minute, self._parse_rate(rate)))
+
+    @property
+    def active(self) -> bool:
+        return bool(self.rate or self.schedule)
+
+    def current_rate(self) -> float:
+        if self.schedule:
+            local_time = datetime.now()
+            minute = local_time.hour * 60 + local_time.minute
+            for start, end, rate in self.schedule:
+                if (start <= minute < end) if start <= end else (minute >= start or minute < end):
+                    return rate
+        return self.rate
+
+    def consume(self, amount: int) -> None:
+        """Wait until the amount of data may be transferred."""
+        if not self.active:
+            return
+        rate = self.current_rate()
+        if not rate:
+            return
+        with self._lock:
+            # the bucket holds up to one second worth of data, a deficit is waited for
+            current_time = time.monotonic()
+            self._tokens = min(rate, self._tokens + (current_time - self._updated) * rate) - amount
+            self._updated = current_time
+            delay = -self._tokens / rate
+        if delay > 0:
+            abort_downloads.wait(delay)
+
+
+rate_limiter = RateLimiter()
+
+
+class PooledResponse:
+    """HTTP response handing its connection back to the pool once the body is read completely."""
+
+    def __init__(self, response: "http.client.HTTPResponse",
+                 release: Optional[Callable[[bool], None]] = None) -> None:
+        self._response = response
+        self._release = release
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._response.getheader(name, default)
+
+    @property
+    def status(self) -> int:
+        return self._response.status
+
+    @property
+    def reason(self) -> str:
+        return self._response.reason
+
+    @property
+    def headers(self) -> "http.client.HTTPMessage":
+        return self._response.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None and rate_limiter.active:
+            import http.client
+            # limit the rate in chunks to spread the transfer evenly
+            chunks = list(iter(lambda: self.read(CHUNK_SIZE), b''))
+            if self._response.length:
+                raise http.client.IncompleteRead(b''.join(chunks), self._response.length)
+            return b''.join(chunks)
+        data = self._response.read(amt)
+        rate_limiter.consume(len(data))
+        if self._response.isclosed():
+            self._done(reusable=not self._response.will_close)
+        return data
+
+    def _done(self, reusable: bool) -> None:
+        if self._release:
+            release, self._release = self._release, None
+            release(reusable)
+
+    def close(self) -> None:
+        # connections with unread data can't be reused
+        self._done(reusable=self._response.isclosed() and not self._response.will_close)
+        self._response.close()
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """Keeps idle HTTP connections per host to reuse them for following requests."""
+
+    redirect_codes = (301, 302, 303, 307, 308)
+    max_redirects = 10
+    headers = {
+        'User-Agent': 'Python-urllib/%d.%d' % sys.version_info[:2],
+        'Accept-Encoding': 'identity',
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str], List["http.client.HTTPConnection"]] = {}
+        self.connections = 0
+        self.requests = 0
+
+    def _connection(self, scheme: str, netloc: str, timeout: float) -> Tuple["http.client.HTTPConnection", bool]:
+        import http.client
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+            self.connections += 1
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=timeout), False
+
+    def _releaser(self, scheme: str, netloc: str,
+                  connection: "http.client.HTTPConnection") -> Callable[[bool], None]:
+        def release(reusable: bool) -> None:
+            if reusable:
+                with self._lock:
+                    self._idle.setdefault((scheme, netloc), []).append(connection)
+            else:
+                connection.close()
+        return release
+
+    def _request(self, url: str, timeout: float, headers: Dict[str, str]) -> PooledResponse:
+        import http.client
+        parsed_url = urllib.parse.urlsplit(url)
+        scheme, netloc = parsed_url.scheme, parsed_url.netloc
+        path = urllib.parse.urlunsplit(('', '', parsed_url.path or '/', parsed_url.query, ''))
+        while True:
+            connection, reused = self._connection(scheme, netloc, timeout)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    # the server closed the idle connection in the meantime
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            with self._lock:
+                self.requests += 1
+            return PooledResponse(response, release=self._releaser(scheme, netloc, connection))
+
+    def urlopen(self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None) -> PooledResponse:
+        """Drop-in replacement for `urllib.request.urlopen` (GET only) following redirects."""
+        import urllib.request
+        request_headers = dict(self.headers, **(headers or {}))
+        scheme = urllib.parse.urlsplit(url).scheme
+        if scheme not in ('http', 'https') or scheme in urllib.request.getproxies():
+            # leave proxies and other protocols to urllib
+            with self._lock:
+                self.connections += 1
+                self.requests += 1
+            return PooledResponse(urllib.request.urlopen(urllib.request.Request(url, headers=request_headers),
+                                                         timeout=timeout))
+
+        for _ in range(self.max_redirects + 1):
+            response = self._request(url, timeout, request_headers)
+            if response.status in self.redirect_codes and response.getheader('location'):
+                with response:
+                    response.read()
+                url = urllib.parse.urljoin(url, response.getheader('location'))
+            elif response.status >= 400:
+                with response:
+                    raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+            else:
+                return response
+        raise urllib.error.HTTPError(url, response.status, 'Too many redirects.', response.headers, None)
+
+
+connection_pool = ConnectionPool()
+
+T = TypeVar('T')
+
+
+class RetryPolicy:
+    """Retries requests failing for temporary reasons with an exponential backoff."""
+
+    def __init__(self, retries: int, delay: float, max_delay: float) -> None:
+        self.retries = retries
+        self.delay = delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_temporary(error: BaseException) -> bool:
+        """Timeouts, connection resets, server errors and rate limits are worth a retry."""
+        import http.client
+        if isinstance(error, urllib.error.HTTPError):
+            return error.code in (408, 429) or error.code >= 500
+        if isinstance(error, urllib.error.URLError):
+            return isinstance(error.reason, (socket.timeout, TimeoutError, ConnectionError))
+        return isinstance(error, (socket.timeout, TimeoutError, ConnectionError, http.client.HTTPException))
+
+    @staticmethod
+    def _retry_after(error: BaseException) -> Optional[float]:
+        retry_after = error.headers.get('retry-after') if isinstance(error, urllib.error.HTTPError) else None
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        import email.utils
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(tz=utc_zone)).total_seconds())
+
+    def backoff(self, error: BaseException, attempt: int, description: str) -> None:
+        """Wait before the given attempt to retry after a temporary error (or give up)."""
+        if attempt > self.retries:
+            raise RetryLimitExceeded(f'retry limit reached, giving up ({error})') from error
+
+        delay = self._retry_after(error)
+        if delay is None:
+            # exponential backoff with jitter to avoid retrying in lockstep
+            delay = min(self.max_delay, self.delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1)
+        elif delay > self.max_delay:
+            raise RetryLimitExceeded(f'retry after {delay:.0f} seconds requested, giving up ({error})') from error
+
+        logger.debug('%s failed (%s), retry %d of %d in %.1f seconds.',
+                     description, error, attempt, self.retries, delay)
+        if abort_downloads.wait(delay):
+            raise OSError('Download aborted.')
+
+    def call(self, function: Callable[..., T], *args: Any, description: str) -> T:
+        attempt = 0
+        while True:
+            try:
+                return function(*args)
+            except Exception as e:
+                if not self.is_temporary(e):
+                    raise
+                attempt += 1
+                self.backoff(e, attempt, description)
+
+
+retry_policy = RetryPolicy(RETRIES, RETRY_DELAY, RETRY_MAX_DELAY)
+
+
+@lru_cache(maxsize=REGEXP_CACHE_SIZE)
+def _compile_search(expression: str) -> Union[str, Callable[[str], Any]]:
+    if REGEXP_SPECIAL_CHARACTERS.search(expression):
+        return re.compile(expression, re.IGNORECASE).search
+    else:
+        # plain text, no need for the regular expression engine
+        return expression.lower()
+
+
+def sqlite_regexp(expression: Optional[str], item: Any) -> bool:
+    """Implementation of the sqlite REGEXP operator (case insensitive search)."""
+    if expression is None or item is None:
+        return False
+    search = _compile_search(expression)
+    if item.__class__ is not str:
+        item = str(item)
+    if search.__class__ is str:
+        return search in item.lower()
+    else:
+        return search(item) is not None  # type: ignore
+
+
+def read_ahead(chunks: Iterator[bytes], depth: int = READ_AHEAD_CHUNKS) -> Iterator[bytes]:
+    """Iterate over chunks, while a background thread is already reading the next ones."""
+
+    buffer: "queue.Queue[Union[bytes, BaseException, None]]" = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def _put(item: Union[bytes, BaseException, None]) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=1)
+            except queue.Full:
+                continue
+            else:
+                return True
+        return False
+
+    def _reader() -> None:
+        try:
+            for chunk in chunks:
+                if not _put(chunk):
+                    break
+            else:
+                _put(None)
+        except BaseException as e:
+            _put(e)
+
+    threading.Thread(target=_reader, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is None:
+                break
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+    finally:
+        stopped.set()
+
+
+class FilmlisteParser:
+    """Incremental parser for the Filmliste format.
+
+    The Filmliste is one big JSON object with repeating keys ("Filmliste" for the meta data and the header,
+    "X" for every single show). Raw data is fed in chunks of any size and every complete key/value pair
+    is returned as soon as it is available, so the whole list never has to be in memory."""
+
+    SEPARATORS = re.compile(r'[\s{},:]*')
+
+    def __init__(self) -> None:
+        self._json_decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._key: Optional[str] = None
+
+    def feed(self, data: bytes) -> Iterator[Tuple[str, Any]]:
+        buffer = self._buffer + self._text_decoder.decode(data)
+        position = 0
+        while True:
+            position = self.SEPARATORS.match(buffer, position).end()  # type: ignore
+            try:
+                item, end = self._json_decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # incomplete item, wait for more data
+                break
+            position = end
+            if self._key is None:
+                self._key = item
+            else:
+                yield self._key, item
+                self._key = None
+        self._buffer = buffer[position:]
+
+    def close(self) -> None:
+        if self._buffer.strip() or self._key is not None:
+            raise ValueError('Filmliste ended unexpectedly.')
+
+
+def _parse_show_rows(data: bytes,
+                     channel: str,
+                     columns: Tuple[int, ...]) -> Tuple[List[List[str]],
+                                                        List[Tuple[Any, ...]],
+                                                        List[Tuple[Any, ...]],
+                                                        Tuple[str, str, str]]:
+    """Rows of the show table for a piece of the Filmliste (run in the processes of `Database._get_shows`).
+
+    Topic and region of the records before the piece are unknown here (unlike the channel). So the records up
+    to the first topic are returned unconverted and the rows up to the first region separately."""
+
+    parser = FilmlisteParser()
+    records = [item for key, item in parser.feed(data) if key == 'X']
+    parser.close()
+
+    # Database.FILMLISTE_COLUMNS starts with channel, topic and region
+    channel_column, topic_column, region_column = columns[:3]
+    topic = ''
+    for start, record in enumerate(records):
+        channel = record[channel_column] or channel
+        topic = record[topic_column] or topic
+        if channel and topic:
+            break
+    else:
+        return records, [], [], ('', '', '')
+
+    region_start = next((i for i in range(start, len(records)) if records[i][region_column]), len(records))
+    getter = operator.itemgetter(*columns)
+    rows_without_region, carried = Database._show_rows(getter, records[start:region_start],
+                                                       (channel, topic, ''))
+    rows, carried = Database._show_rows(getter, records[region_start:], carried)
+    return records[:start], rows_without_region, rows, carried
+
+
 class Database(object):
 
     # noinspection SpellCheckingInspection
@@ -302,6 +965,18 @@ class Database(object):
         'neu': 'new'
     }
 
+    # Filmliste columns used for the show table (as expected by _show_rows)
+    FILMLISTE_COLUMNS = ('channel', 'topic', 'region', 'title', 'size', 'start', 'duration', 'description',
+                         'website', 'new', 'url', 'url_hd', 'url_small', 'url_subtitles')
+
+    # start of a record and of a record with a channel (the group) in the decompressed Filmliste (neither can
+    # occur within a JSON string)
+    RECORD_START = re.compile(rb',\s*"X"\s*:\s*\[')
+    CHANNEL_START = re.compile(rb',\s*"X"\s*:\s*\[\s*("(?:[^"\\]|\\.)+")', re.DOTALL)
+
+    # anchored regular expressions without any special characters
+    LITERAL_PATTERN = re.compile(r'^\^(?P<text>(?:(?![.^$*+?{}\[\]\\|()])[\x20-\x7e])+)(?P<end>\$?)$')
+
     class Item(TypedDict):
         hash: str
         channel: str
@@ -321,6 +996,13 @@ class Database(object):
         age: timedelta
         downloaded: Optional[datetime]
 
+    # fields stored in lookup tables, the shows reference them by id
+    LOOKUP_FIELDS = ('channel', 'region', 'topic')
+
+    # fields of the shows, the age is computed from the start and downloaded is read from the history
+    FIELDS = ('hash', 'channel', 'description', 'region', 'size', 'title', 'topic', 'website', 'new', 'url_http',
+              'url_http_hd', 'url_http_small', 'url_subtitles', 'start', 'duration', 'age', 'downloaded')
+
     def database_file(self, schema: str = 'main') -> Path:
         cursor = self.connection.cursor()
         database_index = {db[1]: db[2] for db in cursor.execute("PRAGMA database_list")}
@@ -334,59 +1016,256 @@ class Database(object):
         cursor = self.connection.cursor()
         return int(cursor.execute('PRAGMA main.user_version;').fetchone()[0])
 
-    def initialize_filmliste(self) -> None:
+    @property
+    def filmliste_base_version(self) -> int:
+        cursor = self.connection.cursor()
+        return int(cursor.execute("SELECT value FROM main.meta WHERE key='base_version'").fetchone()[0])
+
+    def _lookup_ids(self, field: str) -> Callable[[Optional[str]], int]:
+        """Function returning the id of a value in the lookup table of the field, new values are added."""
+        cursor = self.connection.cursor()
+        ids: Dict[Optional[str], int] = {row[0]: row[1] for row in cursor.execute(f"SELECT name, id FROM main.{field}")}
+
+        def _id(value: Optional[str]) -> int:
+            try:
+                return ids[value]
+            except KeyError:
+                cursor.execute(f"INSERT INTO main.{field} (name) VALUES (?)", (value,))
+                ids[value] = cursor.lastrowid  # type: ignore
+                return ids[value]
+
+        return _id
+
+    def _insert_shows(self, url: str, table: str = 'show_data') -> int:
+        cursor = self.connection.cursor()
+        count = 0
+        channel_id, region_id, topic_id = (self._lookup_ids(f) for f in ('channel', 'region', 'topic'))
+
+        # get show data in batches, while the list is still downloaded and parsed
+        shows = iter(self._get_shows(url))
+        while True:
+            batch = list(islice(shows, INSERT_BATCH_SIZE))
+            if not batch:
+                return count
+            cursor.executemany(f"""
+                INSERT OR REPLACE INTO main.{table}
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(r[0], channel_id(r[1]), r[2], region_id(r[3]), r[4], r[5], topic_id(r[6])) + r[7:] for r in batch])
+            count += len(batch)
+
+    @contextmanager
+    def _import_settings(self) -> Iterator[None]:
+        """Apply the import pragmas of the database profile, the previous values are restored afterwards."""
+        # the sync level can't be changed within a transaction, so this has to wrap the whole import
+        cursor = self.connection.cursor()
+        _, _, pragmas = DATABASE_PROFILES[self.profile]
+        previous = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in pragmas}
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+
+    def _begin_update(self, cursor: sqlite3.Cursor, wait: bool) -> None:
+        """Start the transaction of a database update.
+
+        Unless waiting is requested, DatabaseLocked is raised right away if another process holds the
+        write lock (for an update of its own)."""
+        if wait:
+            cursor.execute("BEGIN IMMEDIATE")
+            return
+
+        busy_timeout = cursor.execute('PRAGMA busy_timeout').fetchone()[0]
+        cursor.execute('PRAGMA busy_timeout=0')
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e):
+                raise DatabaseLocked(str(e)) from e
+            raise
+        finally:
+            cursor.execute(f'PRAGMA busy_timeout={busy_timeout}')
+
+    def initialize_filmliste(self, wait: bool = True) -> None:
         logger.debug('Initializing Filmliste database in %r.', self.database_file('main'))
         cursor = self.connection.cursor()
+        start = time.monotonic()
+        with self._import_settings():
+            count = self._initialize_filmliste(cursor, wait)
+        logger.debug('Imported %d shows in %.1f seconds.', count, time.monotonic() - start)
+
+    def _initialize_filmliste(self, cursor: sqlite3.Cursor, wait: bool = True) -> int:
+        # The new list is built in a shadow table, which is swapped in by the same transaction. Readers
+        # keep using the current list until the commit and a failed update leaves it untouched.
+        self._begin_update(cursor, wait)
         try:
-            cursor.execute("""        
-                CREATE TABlE main.show (
+            # Channels, topics and regions are stored once in lookup tables and referenced by their ids. The
+            # tables are shared with the current list, values not used anymore are removed after the swap.
+            for field in self.LOOKUP_FIELDS:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS main.{field} (
+                        id INTEGER PRIMARY KEY,
+                        name TEXT,
+                        UNIQUE (name)
+                    );
+                """)
+            cursor.execute("""
+                CREATE TABlE main.show_build (
                     hash TEXT,
-                    channel TEXT,
+                    channel_id INTEGER,
                     description TEXT,
-                    region TEXT,
+                    region_id INTEGER,
                     size INTEGER,
                     title TEXT,
-                    topic TEXT,
+                    topic_id INTEGER,
                     website TEXT,
                     new BOOLEAN,
                     url_http TEXT,
-                    url_http_hd TEXT,
-                    url_http_small TEXT,
+                    url_http_hd_delta TEXT,
+                    url_http_small_delta TEXT,
                     url_subtitles TEXT,
                     start TIMESTAMP,
                     duration TIMEDELTA,
-                    age TIMEDELTA
+                    UNIQUE (hash)
                 );
             """)
-        except sqlite3.OperationalError:
-            cursor.execute("DELETE FROM main.show")
-
-        # get show data
-        cursor.executemany("""
-            INSERT INTO main.show
-            VALUES (
-                :hash,
-                :channel,
-                :description,
-                :region,
-                :size,
-                :title,
-                :topic,
-                :website,
-                :new,
-                :url_http,
-                :url_http_hd,
-                :url_http_small,
-                :url_subtitles,
-                :start,
-                :duration,
-                :age
-            ) 
-        """, self._get_shows())
-
-        cursor.execute(f'PRAGMA user_version={int(now.timestamp())}')
+            count = self._insert_shows(FILMLISTE_URL, table='show_build')
+
+            cursor.execute("DROP TABLE IF EXISTS main.show_fts")
+            cursor.execute("DROP VIEW IF EXISTS main.show")
+            cursor.execute("DROP TABLE IF EXISTS main.show_data")
+            cursor.execute("ALTER TABLE main.show_build RENAME TO show_data")
+
+            # secondary indexes are created after the bulk insert (names are free now the old list is gone)
+            cursor.execute("CREATE INDEX main.show_start ON show_data (start)")
+            for field in self.LOOKUP_FIELDS:
+                cursor.execute(f"CREATE INDEX main.show_{field} ON show_data ({field}_id)")
+                cursor.execute(f"DELETE FROM main.{field} WHERE id NOT IN (SELECT {field}_id FROM main.show_data)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS main.channel_name ON channel (name COLLATE NOCASE)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS main.topic_name ON topic (name COLLATE NOCASE)")
+            cursor.execute("CREATE INDEX main.show_dow ON show_data (CAST(strftime('%w', start) AS INTEGER))")
+            cursor.execute("CREATE INDEX main.show_minute ON show_data (CAST(strftime('%M', start) AS INTEGER))")
+
+            # the shows with the values of the lookup tables and the urls of all qualities (the rowid is the one
+            # of the table, for the full text index), the ids can be used to filter
+            cursor.execute(f"""
+                CREATE VIEW main.show AS
+                SELECT show_data.rowid AS rowid,
+                       hash,
+                       channel.name AS channel,
+                       description,
+                       region.name AS region,
+                       size,
+                       title,
+                       topic.name AS topic,
+                       website,
+                       new,
+                       url_http,
+                       {self._expanded_url('url_http_hd_delta')} AS url_http_hd,
+                       {self._expanded_url('url_http_small_delta')} AS url_http_small,
+                       url_subtitles,
+                       start,
+                       duration,
+                       channel_id,
+                       region_id,
+                       topic_id
+                FROM main.show_data
+                JOIN main.channel ON channel.id = show_data.channel_id
+                JOIN main.region ON region.id = show_data.region_id
+                JOIN main.topic ON topic.id = show_data.topic_id
+            """)
+            self._create_full_text_index()
+            cursor.execute("ANALYZE main")
 
-        self.connection.commit()
+            cursor.execute("""
+                CREATE TABlE IF NOT EXISTS main.meta (
+                    key TEXT PRIMARY KEY,
+                    value
+                );
+            """)
+            cursor.execute("INSERT OR REPLACE INTO main.meta VALUES ('base_version', ?)", (int(now.timestamp()),))
+            cursor.execute(f'PRAGMA user_version={int(now.timestamp())}')
+        except BaseException:
+            self.connection.rollback()
+            raise
+        else:
+            self.connection.commit()
+            return count
+
+    @staticmethod
+    def _expanded_url(column: str) -> str:
+        """Expression of the url of another quality.
+
+        The Filmliste gives them as suffix of the url (url_http) or as '<offset>|<text>', the text replaces
+        the url after the offset."""
+        return f"""
+            CASE WHEN instr({column}, '|')
+                 THEN substr(url_http, 1, CAST(substr({column}, 1, instr({column}, '|') - 1) AS INTEGER))
+                      || substr({column}, instr({column}, '|') + 1)
+                 ELSE url_http || {column}
+            END"""
+
+    def _create_full_text_index(self) -> None:
+        cursor = self.connection.cursor()
+        # diacritics are kept, so words match like in the REGEXP search used without the index
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE main.show_fts USING fts5(
+                    title,
+                    topic,
+                    description,
+                    content='show',
+                    content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 0'
+                );
+            """)
+        except sqlite3.OperationalError as e:
+            logger.debug('Full text index not available: %s', e)
+            return
+
+        cursor.execute("INSERT INTO main.show_fts(show_fts) VALUES ('rebuild')")
+
+        # keep the index up to date when changes are applied (replaced rows fire the delete trigger too,
+        # because recursive triggers are enabled)
+        cursor.execute("""
+            CREATE TRIGGER main.show_fts_insert AFTER INSERT ON show_data BEGIN
+                INSERT INTO show_fts(rowid, title, topic, description)
+                VALUES (new.rowid, new.title, (SELECT name FROM topic WHERE id = new.topic_id), new.description);
+            END;
+        """)
+        cursor.execute("""
+            CREATE TRIGGER main.show_fts_delete AFTER DELETE ON show_data BEGIN
+                INSERT INTO show_fts(show_fts, rowid, title, topic, description)
+                VALUES ('delete', old.rowid, old.title, (SELECT name FROM topic WHERE id = old.topic_id),
+                        old.description);
+            END;
+        """)
+
+    @property
+    def has_full_text_index(self) -> bool:
+        cursor = self.connection.cursor()
+        return bool(cursor.execute("SELECT count(*) FROM main.sqlite_master WHERE name='show_fts'").fetchone()[0])
+
+    def update_filmliste(self, wait: bool = True) -> None:
+        logger.debug('Updating Filmliste database in %r.', self.database_file('main'))
+        cursor = self.connection.cursor()
+
+        # The diff list contains all shows added or changed since the last full list was published. Shows
+        # removed upstream are not part of it, they get dropped with the next full rebuild.
+        start = time.monotonic()
+        with self._import_settings():
+            self._begin_update(cursor, wait)
+            try:
+                count = self._insert_shows(FILMLISTE_DIFF_URL)
+                cursor.execute(f'PRAGMA user_version={int(now.timestamp())}')
+            except BaseException:
+                self.connection.rollback()
+                raise
+            else:
+                self.connection.commit()
+        logger.debug('Imported %d changed shows in %.1f seconds.', count, time.monotonic() - start)
 
     @property
     def history_version(self) -> int:
@@ -417,163 +1296,339 @@ class Database(object):
 
         self.connection.commit()
 
-    def __init__(self, filmliste: Path, history: Path) -> None:
+    def __init__(self,
+                 filmliste: Path,
+                 history: Path,
+                 snapshot: bool = False,
+                 parse_processes: int = 1,
+                 profile: str = 'fast') -> None:
+        if profile not in DATABASE_PROFILES:
+            raise ConfigurationError(f'Invalid database profile {profile!r} '
+                                     f'(expected one of {", ".join(DATABASE_PROFILES)}).')
+        self.profile = profile
+        self.parse_processes = parse_processes or os.cpu_count() or 1
         filmliste_path = filmliste.parent / filmliste.name.format(script_version=self._script_version)
+        self.snapshot_path = filmliste_path.with_suffix('.snapshot') if snapshot else None
+        self._snapshot: Optional["Snapshot"] = None
+        self._downloaded: Optional[Dict[str, datetime]] = None
         logger.debug('Opening Filmliste database %r.', filmliste_path)
         self.connection = sqlite3.connect(filmliste_path.absolute().as_posix(),
                                           detect_types=sqlite3.PARSE_DECLTYPES,
                                           timeout=10)
+        # readers don't have to wait for a running database update (unless the journal has to work without
+        # shared memory on network file systems)
+        journal_mode, mmap_size, _ = DATABASE_PROFILES[profile]
+        self.connection.execute(f'PRAGMA main.journal_mode={journal_mode}')
+        if mmap_size:
+            self.connection.execute(f'PRAGMA main.mmap_size={mmap_size}')
         logger.debug('Opening History database %r.', history)
         self.connection.cursor().execute("ATTACH ? AS history", (history.as_posix(),))
 
+        self.connection.execute('PRAGMA recursive_triggers=ON')
         self.connection.row_factory = sqlite3.Row
-        self.connection.create_function("REGEXP", 2,
-                                        lambda expr, item: re.compile(expr, re.IGNORECASE).search(item) is not None)
+        self.connection.create_function("REGEXP", 2, sqlite_regexp)
         if self.filmliste_version == 0:
             self.initialize_filmliste()
         if self.history_version == 0:
             self.initialize_history()
 
-    @staticmethod
-    def _qualify_url(basis: str, extension: str) -> Union[str, None]:
-        if extension:
-            if '|' in extension:
-                offset, text = extension.split('|', maxsplit=1)
-                return basis[:int(offset)] + text
-            else:
-                return basis + extension
-        else:
-            return None
-
     @staticmethod
     def _duration_in_seconds(duration: str) -> int:
-        if duration:
-            match = re.match(r'(?P<h>\d+):(?P<m>\d+):(?P<s>\d+)', duration)
-            if match:
-                parts = match.groupdict()
-                return int(timedelta(hours=int(parts['h']),
-                                     minutes=int(parts['m']),
-                                     seconds=int(parts['s'])).total_seconds())
+        hours, _, rest = duration.partition(':')
+        minutes, _, seconds = rest.partition(':')
+        if (hours + minutes + seconds).isdecimal() and hours and minutes and seconds:
+            return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+        # anything else than HH:MM:SS, a leading HH:MM:SS still counts
+        match = re.match(r'(?P<h>\d+):(?P<m>\d+):(?P<s>\d+)', duration)
+        if match:
+            parts = match.groupdict()
+            return int(timedelta(hours=int(parts['h']),
+                                 minutes=int(parts['m']),
+                                 seconds=int(parts['s'])).total_seconds())
         return 0
 
     @staticmethod
     def _show_hash(channel: str, topic: str, title: str, size: int, start: datetime) -> str:
-        h = hashlib.sha1()
-        h.update(channel.encode())
-        h.update(topic.encode())
-        h.update(title.encode())
-        h.update(str(size).encode())
-        h.update(str(start.timestamp()).encode())
-        return h.hexdigest()
+        return hashlib.sha1(f'{channel}{topic}{title}{size}{start.timestamp()}'.encode()).hexdigest()
 
-    @contextmanager
-    def _showlist(self, retries: int = 3) -> Iterator[BytesIO]:
-        while retries:
-            retries -= 1
-            try:
-                logger.debug('Opening database from %r.', FILMLISTE_URL)
-                response: http.client.HTTPResponse = urllib.request.urlopen(FILMLISTE_URL, timeout=9)
-                total_size = int(response.getheader('content-length') or 0)
-                with BytesIO() as buffer:
-                    with progress_bar() as progress:
-                        bar_id = progress.add_task(
-                            total=total_size,
-                            description='Downloading database')
-                        while True:
-                            data = response.read(CHUNK_SIZE)
-                            if not data:
-                                break
-                            else:
-                                progress.update(bar_id, advance=len(data))
-                                buffer.write(data)
-                    buffer.seek(0)
-                    yield buffer
-            except urllib.error.HTTPError as e:
-                if retries:
-                    logger.debug('Database download failed (%d more retries): %s' % (retries, e))
+    @staticmethod
+    def _show_rows(columns: Callable[[List[str]], Tuple[str, ...]],
+                   records: List[List[str]],
+                   carried: Tuple[str, str, str]) -> Tuple[List[Tuple[Any, ...]], Tuple[str, str, str]]:
+        """Rows of the show table for the Filmliste records (in the order of the table columns).
+
+        The Filmliste leaves channel, topic and region empty if they didn't change, so the values to start with
+        are given and the ones to continue with are returned along with the rows."""
+
+        channel, topic, region = carried
+        show_hash_of = Database._show_hash
+        duration_in_seconds = Database._duration_in_seconds
+        rows = []
+        for record in records:
+            (record_channel, record_topic, record_region, title, size, start, duration, description,
+             website, new, url, url_hd, url_small, url_subtitles) = columns(record)
+            channel = record_channel or channel
+            topic = record_topic or topic
+            region = record_region or region
+            if start and url:
+                show_size = int(size) if size else 0
+                start_seconds = int(start)
+                start_time = EPOCH + timedelta(seconds=start_seconds)
+                try:
+                    show_hash = show_hash_of(channel, topic, title, show_size, start_time)
+                except OSError:
+                    # The naive timestamp() call may fail because there are issues with very old
+                    # timestamps on Windows. See: https://bugs.python.org/issue36439
+                    continue
+                # the other qualities are stored like in the list (expanded by the show view)
+                # timedelta values are stored as seconds, the adapter is skipped
+                rows.append((show_hash,
+                             channel,
+                             description,
+                             region,
+                             show_size,
+                             title,
+                             topic,
+                             website,
+                             new == 'true',
+                             str(url) or None,
+                             url_hd or None,
+                             url_small or None,
+                             url_subtitles,
+                             start_time,
+                             duration_in_seconds(duration)))
+        return rows, (channel, topic, region)
+
+    @staticmethod
+    def _open_showlist(url: str, offset: int) -> PooledResponse:
+        if not offset:
+            logger.debug('Opening database from %r.', url)
+            return connection_pool.urlopen(url, timeout=9)
+
+        response = connection_pool.urlopen(url, timeout=9, headers={'Range': f'bytes={offset}-'})
+        if response.status != 206 or not (response.getheader('content-range') or '').startswith(f'bytes {offset}-'):
+            response.close()
+            raise OSError('Server does not support resuming the database download.')
+        return response
+
+    def _showlist(self, url: str) -> Iterator[bytes]:
+        import http.client
+        description = 'Database download'
+        response = retry_policy.call(self._open_showlist, url, 0, description=description)
+        total_size = int(response.getheader('content-length') or 0)
+        received = 0
+        attempt = 0
+        with progress_bar() as progress, ExitStack() as stack:
+            stack.callback(lambda: response.close())
+            bar_id = progress.add_task(
+                total=total_size,
+                description='Downloading database')
+            while True:
+                try:
+                    data = response.read(CHUNK_SIZE)
+                    if not data and received < total_size:
+                        raise http.client.IncompleteRead(b'', total_size - received)
+                except Exception as e:
+                    # continue an interrupted download where it stopped
+                    response.close()
+                    if not retry_policy.is_temporary(e):
+                        raise
+                    attempt += 1
+                    retry_policy.backoff(e, attempt, description)
+                    response = retry_policy.call(self._open_showlist, url, received, description=description)
+                    continue
+                if not data:
+                    break
                 else:
-                    logger.error('Database download failed (no more retries): %s' % e)
-                    raise RetryLimitExceeded('retry limit reached, giving up')
-                time.sleep(10)
-            else:
-                break
+                    received += len(data)
+                    progress.update(bar_id, advance=len(data))
+                    yield data
 
     @property
     def _script_version(self) -> int:
         return int(os.environ.get('SCRIPT_VERSION', Path(__file__).stat().st_mtime))
 
-    def _get_shows(self) -> Iterable["Database.Item"]:
+    def _filmliste_columns(self, header: List[str]) -> Tuple[int, ...]:
+        translated_header = [self.TRANSLATION.get(h, h) for h in header]
+        return tuple(translated_header.index(c) for c in self.FILMLISTE_COLUMNS)
+
+    def _decompressed_showlist(self, url: str) -> Iterator[bytes]:
+        decompressor = lzma.LZMADecompressor()
+        for chunk in self._showlist(url):
+            yield decompressor.decompress(chunk)
+        if not decompressor.eof:
+            raise EOFError('Compressed database ended before the end-of-stream marker was reached.')
+
+    def _filmliste_pieces(self, url: str) -> Iterator[Tuple[bytes, str]]:
+        """The decompressed Filmliste, first the meta data and the header, then pieces of whole records. Every
+        piece comes with the channel of the record before."""
+        parts: List[bytes] = []
+        size = 0
+        channel = ''
+        header_found = False
+        for data in read_ahead(self._decompressed_showlist(url)):
+            parts.append(data)
+            size += len(data)
+            if header_found and size < PARSE_CHUNK_SIZE:
+                continue
+            buffer = b''.join(parts)
+            if not header_found:
+                match = self.RECORD_START.search(buffer)
+                if not match:
+                    parts = [buffer]
+                    continue
+                yield buffer[:match.start()], channel
+                buffer = buffer[match.start():]
+                header_found = True
+            end = 0
+            if len(buffer) >= PARSE_CHUNK_SIZE:
+                for match in self.RECORD_START.finditer(buffer, len(buffer) - PARSE_CHUNK_SIZE // 4):
+                    end = match.start()
+            if end:
+                piece, buffer = buffer[:end], buffer[end:]
+                yield piece, channel
+                last_channel = deque(self.CHANNEL_START.finditer(piece), maxlen=1)
+                if last_channel:
+                    channel = json.loads(last_channel[0].group(1))
+            parts, size = [buffer], len(buffer)
+
+        yield b''.join(parts), channel
+
+    def _get_shows_in_processes(self, url: str) -> Iterator[Tuple[Any, ...]]:
+        """Same as `_get_shows`, but the pieces of the Filmliste are parsed and converted in a pool of processes."""
+        import multiprocessing
+
+        pieces = self._filmliste_pieces(url)
+        parser = FilmlisteParser()
+        header = [item for key, item in parser.feed(next(pieces)[0]) if key == 'Filmliste']
+        parser.close()
+        if len(header) < 2:
+            raise ValueError('Filmliste header missing.')
+        columns = self._filmliste_columns(header[1])
+        getter = operator.itemgetter(*columns)
+        carried = ('', '', '')
+
+        def _rows(result: Tuple[List[List[str]], List[Tuple[Any, ...]], List[Tuple[Any, ...]],
+                                Tuple[str, str, str]]) -> Iterator[Tuple[Any, ...]]:
+            nonlocal carried
+            records, rows_without_region, rows, piece_carried = result
+            first_rows, carried = self._show_rows(getter, records, carried)
+            yield from first_rows
+            region = carried[2]
+            if region:
+                yield from (row[:3] + (region,) + row[4:] for row in rows_without_region)
+            else:
+                yield from rows_without_region
+            yield from rows
+            carried = (piece_carried[0] or carried[0], piece_carried[1] or carried[1], piece_carried[2] or carried[2])
+
+        logger.debug('Loading database items in %d processes.', self.parse_processes)
+        with multiprocessing.get_context('spawn').Pool(self.parse_processes) as pool:
+            results: Deque[Any] = deque()
+            for piece, channel in pieces:
+                results.append(pool.apply_async(_parse_show_rows, (piece, channel, columns)))
+                # the pieces are converted in parallel, but the rows are taken over in order
+                while len(results) > 2 * self.parse_processes:
+                    yield from _rows(results.popleft().get())
+            while results:
+                yield from _rows(results.popleft().get())
+
+    def _get_shows(self, url: str) -> Iterator[Tuple[Any, ...]]:
+        if self.parse_processes > 1:
+            yield from self._get_shows_in_processes(url)
+            return
+
         meta: Dict[str, Any] = {}
-        header: List[str] = []
-        channel, topic, region = '', '', ''
-        with self._showlist() as showlist_archive:
-            with lzma.open(showlist_archive, 'rt', encoding='utf-8') as fh:
-                logger.debug('Loading database items.')
-                data = json.load(fh, object_pairs_hook=lambda _pairs: _pairs)
-                with progress_bar() as progress:
-                    bar_id = progress.add_task(
-                        total=len(data),
-                        description='Reading database items')
-                    for p in data:
-                        progress.update(bar_id, advance=1)
-                        if not meta and p[0] == 'Filmliste':
-                            meta = {
-                                # p[1][0] is local date, p[1][1] is gmt date
-                                'date': datetime.strptime(p[1][1], '%d.%m.%Y, %H:%M').replace(tzinfo=utc_zone),
-                                'crawler_version': p[1][2],
-                                'crawler_agent': p[1][3],
-                                'list_id': p[1][4],
-                            }
-
-                        elif p[0] == 'Filmliste':
-                            if not header:
-                                header = p[1]
-                                for i, h in enumerate(header):
-                                    header[i] = self.TRANSLATION.get(h, h)
-
-                        elif p[0] == 'X':
-                            show = dict(zip(header, p[1]))
-                            channel = show.get('channel') or channel
-                            topic = show.get('topic') or topic
-                            region = show.get('region') or region
-                            if show['start'] and show['url']:
-                                title = show['title']
-                                size = int(show['size']) if show['size'] else 0
-                                try:
-                                    start = datetime.fromtimestamp(int(show['start']), tz=utc_zone).replace(tzinfo=None)
-                                except OSError:
-                                    # The datetime.fromtimestamp call may fail because there are issues
-                                    # with very old timestamps on Windows. See: https://bugs.python.org/issue36439
-                                    continue
-                                duration = timedelta(seconds=self._duration_in_seconds(show['duration']))
-                                yield {
-                                    'hash': self._show_hash(channel, topic, title, size, start),
-                                    'channel': channel,
-                                    'description': show['description'],
-                                    'region': region,
-                                    'size': size,
-                                    'title': title,
-                                    'topic': topic,
-                                    'website': show['website'],
-                                    'new': show['new'] == 'true',
-                                    'url_http': str(show['url']) or None,
-                                    'url_http_hd': self._qualify_url(show['url'], show['url_hd']),
-                                    'url_http_small': self._qualify_url(show['url'], show['url_small']),
-                                    'url_subtitles': show['url_subtitles'],
-                                    'start': start,
-                                    'duration': duration,
-                                    'age': now.replace(tzinfo=None)-start,
-                                    'downloaded': None,
-                                }
-
-    def initialize_if_old(self, refresh_after: int) -> None:
+        columns: Optional[Callable[[List[str]], Tuple[str, ...]]] = None
+        carried = ('', '', '')
+        parser = FilmlisteParser()
+        logger.debug('Loading database items.')
+        for data in read_ahead(self._decompressed_showlist(url)):
+            records = []
+            for p in parser.feed(data):
+                if p[0] == 'X':
+                    records.append(p[1])
+
+                elif not meta and p[0] == 'Filmliste':
+                    meta = {
+                        # p[1][0] is local date, p[1][1] is gmt date
+                        'date': datetime.strptime(p[1][1], '%d.%m.%Y, %H:%M').replace(tzinfo=utc_zone),
+                        'crawler_version': p[1][2],
+                        'crawler_agent': p[1][3],
+                        'list_id': p[1][4],
+                    }
+
+                elif p[0] == 'Filmliste':
+                    if columns is None:
+                        columns = operator.itemgetter(*self._filmliste_columns(p[1]))
+
+            if records:
+                if columns is None:
+                    raise ValueError('Filmliste header missing.')
+                rows, carried = self._show_rows(columns, records, carried)
+                yield from rows
+
+        parser.close()
+
+    def initialize_if_old(self, refresh_after: int, full_refresh_after: int) -> None:
+        update_errors = (RetryLimitExceeded, OSError, EOFError, ValueError, lzma.LZMAError, sqlite3.OperationalError)
         database_age = now - datetime.fromtimestamp(self.filmliste_version, tz=utc_zone)
         if database_age > timedelta(hours=refresh_after):
-            logger.debug('Database age is %s (too old).', database_age)
-            self.initialize_filmliste()
+            try:
+                base_age = now - datetime.fromtimestamp(self.filmliste_base_version, tz=utc_zone)
+                if base_age > timedelta(hours=full_refresh_after):
+                    logger.debug('Database age is %s (too old, last full update %s ago).', database_age, base_age)
+                    self.initialize_filmliste(wait=False)
+                else:
+                    logger.debug('Database age is %s (too old, applying changes).', database_age)
+                    try:
+                        self.update_filmliste(wait=False)
+                    except update_errors as e:
+                        self.connection.rollback()
+                        logger.warning('Applying database changes failed (%s), doing a full update.', e)
+                        self.initialize_filmliste(wait=False)
+            except DatabaseLocked:
+                # another process is updating the database, its list is used once it's done
+                logger.debug('Database is being updated by another process, using the current one.')
+            except update_errors as e:
+                logger.error('Database update failed (%s), using the current one (age is %s).', e, database_age)
         else:
             logger.debug('Database age is %s.', database_age)
 
+        if self.snapshot_path and self.snapshot is None:
+            self._close_snapshot()
+            logger.debug('Writing snapshot %r.', self.snapshot_path)
+            try:
+                Snapshot.write(self.snapshot_path, self.connection, self.filmliste_version)
+            except OSError as e:
+                logger.warning('Writing snapshot failed (%s), using the database.', e)
+
+    def _close_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    @property
+    def snapshot(self) -> Optional["Snapshot"]:
+        """Snapshot of the current show list (if enabled and up to date)."""
+        if self.snapshot_path and (self._snapshot is None or self._snapshot.version != self.filmliste_version):
+            self._close_snapshot()
+            try:
+                self._snapshot = Snapshot(self.snapshot_path)
+            except (OSError, ValueError) as e:
+                logger.debug('Snapshot not available: %s', e)
+                self._snapshot = None
+        if self._snapshot and self._snapshot.version == self.filmliste_version:
+            return self._snapshot
+        return None
+
+    def _downloaded_hashes(self) -> Dict[str, datetime]:
+        """Download dates by show hash, the history is read once and again only after it was changed."""
+        if self._downloaded is None:
+            cursor = self.connection.cursor()
+            self._downloaded = dict(cursor.execute("SELECT hash, downloaded FROM history.downloaded").fetchall())
+        return self._downloaded
+
     def add_to_downloaded(self, show: "Database.Item") -> None:
         cursor = self.connection.cursor()
         try:
@@ -596,12 +1651,14 @@ class Database(object):
         except sqlite3.IntegrityError:
             pass
         self.connection.commit()
+        self._downloaded = None
 
     def purge_downloaded(self) -> None:
         cursor = self.connection.cursor()
         # noinspection SqlWithoutWhere
         cursor.execute("DELETE FROM history.downloaded")
         self.connection.commit()
+        self._downloaded = None
 
     def remove_from_downloaded(self, show_hash: str) -> bool:
         if not len(show_hash) >= 10:
@@ -620,9 +1677,58 @@ class Database(object):
         else:
             cursor.execute("DELETE FROM history.downloaded WHERE hash=?", (found_shows[0],))
             self.connection.commit()
+            self._downloaded = None
             logger.info('Removed %s from history.', show_hash)
             return True
 
+    @classmethod
+    def _search_condition(cls, field: str, pattern: str, column: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """Condition for a case insensitive regular expression search in a text field.
+
+        Anchored patterns without special characters are turned into comparisons an index can answer. That
+        is only done for ascii text, because the sqlite case folding doesn't handle anything else. Fields
+        of lookup tables are searched in the distinct values, the shows are selected by the matching ids."""
+
+        if field in cls.LOOKUP_FIELDS and not column:
+            condition, arguments = cls._search_condition(field, pattern, column='name')
+            return f"show.{field}_id IN (SELECT id FROM main.{field} WHERE {condition})", arguments
+        column = column or f'show.{field}'
+
+        match = cls.LITERAL_PATTERN.match(pattern)
+        if match:
+            text = match.group('text')
+            if field == 'hash':
+                # hashes are lower case hex digests and indexed case sensitive
+                text = text.lower()
+                if match.group('end'):
+                    return "show.hash=?", [text]
+                else:
+                    return "show.hash>=? AND show.hash<?", [text, text[:-1] + chr(ord(text[-1]) + 1)]
+            elif match.group('end'):
+                return f"{column}=? COLLATE NOCASE", [text]
+            elif '%' not in text and '_' not in text:
+                return f"{column} LIKE ?", [text + '%']
+
+        return f"{column} REGEXP ?", [pattern]
+
+    def _word_search_condition(self, field: str, pattern: str) -> Tuple[str, List[Any]]:
+        """Condition for a search of words or a phrase in a text field."""
+
+        prefix = pattern.rstrip().endswith('*')
+        words = pattern.strip().rstrip('*').strip()
+        if not words:
+            # the full text index would match nothing and the REGEXP fallback everything
+            raise ConfigurationError(f'Invalid pattern {pattern!r} for {field!r} (words expected).')
+        if self.has_full_text_index:
+            phrase = '"%s"' % words.replace('"', '""')
+            return ("show.rowid IN (SELECT rowid FROM main.show_fts WHERE show_fts MATCH ?)",
+                    [f"{field} : {phrase}{' *' if prefix else ''}"])
+        else:
+            expression = r'\b' + r'\W+'.join(re.escape(w) for w in words.split()) + ('' if prefix else r'\b')
+            if field in self.LOOKUP_FIELDS:
+                return f"show.{field}_id IN (SELECT id FROM main.{field} WHERE name REGEXP ?)", [expression]
+            return f"show.{field} REGEXP ?", [expression]
+
     @staticmethod
     def read_filter_sets(sets_file_path: Optional[Path], default_filter: List[str]) -> Iterator[List[str]]:
         if sets_file_path:
@@ -633,135 +1739,208 @@ class Database(object):
         else:
             yield default_filter
 
-    def filtered(self,
-                 rules: List[str],
-                 include_future: bool = False,
-                 limit: Optional[int] = None) -> Iterator["Database.Item"]:
+    @staticmethod
+    def _parse_rule(rule: str) -> Tuple[str, str, str]:
+        match = re.match(r'^(?P<field>\w+)(?P<operator>(?:=|!=|~|!~|\+|-|\W+))(?P<pattern>.*)$', rule)
+        if not match:
+            raise ConfigurationError('Invalid filter definition. '
+                                     'Property and filter rule expected separated by an operator.')
+
+        field, operator, pattern = match.group('field'), match.group('operator'), match.group('pattern')
+
+        # replace odd names
+        field = {
+            'url': 'url_http'
+        }.get(field, field)
 
+        if field not in ('description', 'region', 'size', 'channel',
+                         'topic', 'title', 'hash', 'url_http', 'duration', 'age', 'start',
+                         'dow', 'hour', 'minute'):
+            raise ConfigurationError('Invalid field %r.' % (field,))
+
+        return field, operator, pattern
+
+    def _rule_conditions(self, rules: List[str]) -> Tuple[List[str], List[Any]]:
+        import durationpy
+        import iso8601
         where = []
         arguments: List[Any] = []
-        if rules:
-            logger.debug('Applying filter: %s (limit: %s)', ', '.join(rules), limit)
+        for f in rules:
+            field, operator, pattern = self._parse_rule(f)  # type: str, str, Any
+
+            if operator == '=':
+                if field in ('description', 'region', 'channel', 'topic', 'title', 'hash', 'url_http'):
+                    condition, condition_arguments = self._search_condition(field, str(pattern))
+                    where.append(condition)
+                    arguments.extend(condition_arguments)
+                elif field == 'size':
+                    where.append(f"show.{field} REGEXP ?")
+                    arguments.append(str(pattern))
+                elif field == 'duration':
+                    where.append(f"show.{field}=?")
+                    arguments.append(durationpy.from_str(pattern).total_seconds())
+                elif field == 'age':
+                    where.append("show.start=?")
+                    arguments.append(now.replace(tzinfo=None) - durationpy.from_str(pattern))
+                elif field in ('start',):
+                    where.append(f"show.{field}=?")
+                    arguments.append(iso8601.parse_date(pattern).isoformat())
+                elif field in ('dow'):
+                    where.append(f"CAST(strftime('%w', show.start) AS INTEGER)=?")
+                    arguments.append(int(pattern))
+                elif field in ('hour'):
+                    where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)=?")
+                    arguments.append(int(pattern))
+                elif field in ('minute'):
+                    where.append(f"CAST(strftime('%M', show.start) AS INTEGER)=?")
+                    arguments.append(int(pattern))
+                else:
+                    raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
+
+            elif operator == '!=':
+                if field in ('description', 'region', 'channel', 'topic', 'title', 'hash', 'url_http'):
+                    condition, condition_arguments = self._search_condition(field, str(pattern))
+                    where.append(f"NOT ({condition})")
+                    arguments.extend(condition_arguments)
+                elif field == 'size':
+                    where.append(f"show.{field} NOT REGEXP ?")
+                    arguments.append(str(pattern))
+                elif field == 'duration':
+                    where.append(f"show.{field}!=?")
+                    arguments.append(durationpy.from_str(pattern).total_seconds())
+                elif field == 'age':
+                    where.append("show.start!=?")
+                    arguments.append(now.replace(tzinfo=None) - durationpy.from_str(pattern))
+                elif field in ('start',):
+                    where.append(f"show.{field}!=?")
+                    arguments.append(iso8601.parse_date(pattern).isoformat())
+                elif field in ('dow'):
+                    where.append(f"CAST(strftime('%w', show.start) AS INTEGER)!=?")
+                    arguments.append(int(pattern))
+                elif field in ('hour'):
+                    where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)!=?")
+                    arguments.append(int(pattern))
+                elif field in ('minute'):
+                    where.append(f"CAST(strftime('%M', show.start) AS INTEGER)!=?")
+                    arguments.append(int(pattern))
+                else:
+                    raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
 
-            for f in rules:
-                match = re.match(r'^(?P<field>\w+)(?P<operator>(?:=|!=|\+|-|\W+))(?P<pattern>.*)$', f)
-                if match:
-                    field, operator, pattern = match.group('field'), \
-                                               match.group('operator'), \
-                                               match.group('pattern')  # type: str, str, Any
-
-                    # replace odd names
-                    field = {
-                        'url': 'url_http'
-                    }.get(field, field)
-
-                    if field not in ('description', 'region', 'size', 'channel',
-                                     'topic', 'title', 'hash', 'url_http', 'duration', 'age', 'start',
-                                     'dow', 'hour', 'minute'):
-                        raise ConfigurationError('Invalid field %r.' % (field,))
-
-                    if operator == '=':
-                        if field in ('description', 'region', 'size', 'channel',
-                                     'topic', 'title', 'hash', 'url_http'):
-                            where.append(f"show.{field} REGEXP ?")
-                            arguments.append(str(pattern))
-                        elif field in ('duration', 'age'):
-                            where.append(f"show.{field}=?")
-                            arguments.append(durationpy.from_str(pattern).total_seconds())
-                        elif field in ('start',):
-                            where.append(f"show.{field}=?")
-                            arguments.append(iso8601.parse_date(pattern).isoformat())
-                        elif field in ('dow'):
-                            where.append(f"CAST(strftime('%w', show.start) AS INTEGER)=?")
-                            arguments.append(int(pattern))
-                        elif field in ('hour'):
-                            where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)=?")
-                            arguments.append(int(pattern))
-                        elif field in ('minute'):
-                            where.append(f"CAST(strftime('%M', show.start) AS INTEGER)=?")
-                            arguments.append(int(pattern))
-                        else:
-                            raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
-
-                    elif operator == '!=':
-                        if field in ('description', 'region', 'size', 'channel',
-                                     'topic', 'title', 'hash', 'url_http'):
-                            where.append(f"show.{field} NOT REGEXP ?")
-                            arguments.append(str(pattern))
-                        elif field in ('duration', 'age'):
-                            where.append(f"show.{field}!=?")
-                            arguments.append(durationpy.from_str(pattern).total_seconds())
-                        elif field in ('start',):
-                            where.append(f"show.{field}!=?")
-                            arguments.append(iso8601.parse_date(pattern).isoformat())
-                        elif field in ('dow'):
-                            where.append(f"CAST(strftime('%w', show.start) AS INTEGER)!=?")
-                            arguments.append(int(pattern))
-                        elif field in ('hour'):
-                            where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)!=?")
-                            arguments.append(int(pattern))
-                        elif field in ('minute'):
-                            where.append(f"CAST(strftime('%M', show.start) AS INTEGER)!=?")
-                            arguments.append(int(pattern))
-                        else:
-                            raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
-
-                    elif operator == '-':
-                        if field in ('duration', 'age'):
-                            where.append(f"show.{field}<=?")
-                            arguments.append(durationpy.from_str(pattern).total_seconds())
-                        elif field in ('size',):
-                            where.append(f"show.{field}<=?")
-                            arguments.append(int(pattern))
-                        elif field == 'start':
-                            where.append(f"show.{field}<=?")
-                            arguments.append(iso8601.parse_date(pattern))
-                        elif field in ('dow'):
-                            where.append(f"CAST(strftime('%w', show.start) AS INTEGER)<=?")
-                            arguments.append(int(pattern))
-                        elif field in ('hour'):
-                            where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)<=?")
-                            arguments.append(int(pattern))
-                        elif field in ('minute'):
-                            where.append(f"CAST(strftime('%M', show.start) AS INTEGER)<=?")
-                            arguments.append(int(pattern))
-                        else:
-                            raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
-
-                    elif operator == '+':
-                        if field in ('duration', 'age'):
-                            where.append(f"show.{field}>=?")
-                            arguments.append(durationpy.from_str(pattern).total_seconds())
-                        elif field in ('size',):
-                            where.append(f"show.{field}>=?")
-                            arguments.append(int(pattern))
-                        elif field == 'start':
-                            where.append(f"show.{field}>=?")
-                            arguments.append(iso8601.parse_date(pattern))
-                        elif field in ('dow'):
-                            where.append(f"CAST(strftime('%w', show.start) AS INTEGER)>=?")
-                            arguments.append(int(pattern))
-                        elif field in ('hour'):
-                            where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)>=?")
-                            arguments.append(int(pattern))
-                        elif field in ('minute'):
-                            where.append(f"CAST(strftime('%M', show.start) AS INTEGER)>=?")
-                            arguments.append(int(pattern))
-                        else:
-                            raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
+            elif operator in ('~', '!~'):
+                if field in ('description', 'topic', 'title'):
+                    condition, condition_arguments = self._word_search_condition(field, str(pattern))
+                    where.append(condition if operator == '~' else f"NOT ({condition})")
+                    arguments.extend(condition_arguments)
+                else:
+                    raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
+
+            elif operator == '-':
+                if field == 'duration':
+                    where.append(f"show.{field}<=?")
+                    arguments.append(durationpy.from_str(pattern).total_seconds())
+                elif field == 'age':
+                    where.append("show.start>=?")
+                    arguments.append(now.replace(tzinfo=None) - durationpy.from_str(pattern))
+                elif field in ('size',):
+                    where.append(f"show.{field}<=?")
+                    arguments.append(int(pattern))
+                elif field == 'start':
+                    where.append(f"show.{field}<=?")
+                    arguments.append(iso8601.parse_date(pattern))
+                elif field in ('dow'):
+                    where.append(f"CAST(strftime('%w', show.start) AS INTEGER)<=?")
+                    arguments.append(int(pattern))
+                elif field in ('hour'):
+                    where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)<=?")
+                    arguments.append(int(pattern))
+                elif field in ('minute'):
+                    where.append(f"CAST(strftime('%M', show.start) AS INTEGER)<=?")
+                    arguments.append(int(pattern))
+                else:
+                    raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
+
+            elif operator == '+':
+                if field == 'duration':
+                    where.append(f"show.{field}>=?")
+                    arguments.append(durationpy.from_str(pattern).total_seconds())
+                elif field == 'age':
+                    where.append("show.start<=?")
+                    arguments.append(now.replace(tzinfo=None) - durationpy.from_str(pattern))
+                elif field in ('size',):
+                    where.append(f"show.{field}>=?")
+                    arguments.append(int(pattern))
+                elif field == 'start':
+                    where.append(f"show.{field}>=?")
+                    arguments.append(iso8601.parse_date(pattern))
+                elif field in ('dow'):
+                    where.append(f"CAST(strftime('%w', show.start) AS INTEGER)>=?")
+                    arguments.append(int(pattern))
+                elif field in ('hour'):
+                    where.append(f"CAST(strftime('%H', datetime(show.start, 'localtime')) AS INTEGER)>=?")
+                    arguments.append(int(pattern))
+                elif field in ('minute'):
+                    where.append(f"CAST(strftime('%M', show.start) AS INTEGER)>=?")
+                    arguments.append(int(pattern))
+                else:
+                    raise ConfigurationError('Invalid operator %r for %r.' % (operator, field))
 
-                    else:
-                        raise ConfigurationError('Invalid operator: %r' % operator)
+            else:
+                raise ConfigurationError('Invalid operator: %r' % operator)
+
+        return where, arguments
+
+    def _projection(self, fields: Optional[List[str]]) -> str:
+        """Columns to select for the given fields (all for None)."""
+        if fields is None:
+            fields = list(self.FIELDS)
+        for field in fields:
+            if field not in self.FIELDS and field != 'sets':
+                raise ConfigurationError('Invalid field %r.' % (field,))
+        # only the columns needed are read, that skips the long descriptions and urls for most outputs
+        columns = [f'show.{f}' for f in self.FIELDS[:-2] if f in fields or (f == 'start' and 'age' in fields)]
+        if 'downloaded' in fields:
+            columns.append('downloaded.downloaded')
+        return ', '.join(columns) or 'show.hash'
+
+    def _items(self, cursor: sqlite3.Cursor, fields: Optional[List[str]] = None) -> Iterator["Database.Item"]:
+        for row in cursor:
+            item = dict(row)
+            # the age is relative to the current time and not to the last database update
+            if 'start' in item:
+                item['age'] = now.replace(tzinfo=None) - item['start']
+            if 'sets' in item:
+                item['sets'] = [int(i) for i in item['sets'].split(',')]
+            if fields is not None:
+                item = {f: item[f] for f in fields if f in item}
+            yield item  # type: ignore
 
-                else:
-                    raise ConfigurationError('Invalid filter definition. '
-                                             'Property and filter rule expected separated by an operator.')
+    def filtered(self,
+                 rules: List[str],
+                 include_future: bool = False,
+                 limit: Optional[int] = None,
+                 fields: Optional[List[str]] = None) -> Iterator["Database.Item"]:
+        """Shows matching the rules, with the given fields only (all fields for None)."""
+
+        if rules:
+            logger.debug('Applying filter: %s (limit: %s)', ', '.join(rules), limit)
+        where, arguments = self._rule_conditions(rules)
+        projection = self._projection(fields)
+
+        snapshot = self.snapshot
+        if snapshot:
+            shows = snapshot.select([self._parse_rule(r) for r in rules], include_future, limit,
+                                    self._downloaded_hashes(), fields)
+            if shows is not None:
+                logger.debug('Selecting shows from the snapshot.')
+                yield from shows
+                return
 
         if not include_future:
-            where.append("date(show.start) < date('now')")
+            # same as date(show.start) < date('now'), but usable with the index
+            where.append("show.start < date('now')")
 
-        query = """
-            SELECT show.*, downloaded.downloaded
+        query = f"""
+            SELECT {projection}
             FROM main.show AS show
             LEFT JOIN history.downloaded ON main.show.hash = history.downloaded.hash
         """
@@ -773,8 +1952,47 @@ class Database(object):
 
         cursor = self.connection.cursor()
         cursor.execute(query, arguments)
-        for row in cursor:
-            yield dict(row)  # type: ignore
+        yield from self._items(cursor, fields)
+
+    def filtered_sets(self,
+                      rule_sets: Iterable[List[str]],
+                      include_future: bool = False,
+                      limit: Optional[int] = None,
+                      fields: Optional[List[str]] = None) -> Iterator["Database.Item"]:
+        """Shows matching any of the rule sets, selected with a single query.
+
+        Every show is returned only once. The numbers of the matching rule sets (starting with 1) are given in
+        the additional field 'sets' (if all fields or 'sets' are selected)."""
+
+        set_conditions = []
+        set_arguments: List[Any] = []
+        for number, rules in enumerate(rule_sets, start=1):
+            logger.debug('Applying filter set %d: %s', number, ', '.join(rules))
+            where, arguments = self._rule_conditions(rules)
+            set_conditions.append(' AND '.join(f'({w})' for w in where) or '1')
+            set_arguments.extend(arguments)
+        if not set_conditions:
+            return
+        projection = self._projection(fields)
+
+        # the sets column is only evaluated for the shows selected by the where clause
+        query = f"""
+            SELECT {projection}, rtrim({' || '.join(
+                f"(CASE WHEN {condition} THEN '{number},' ELSE '' END)"
+                for number, condition in enumerate(set_conditions, start=1))}, ',') AS sets
+            FROM main.show AS show
+            LEFT JOIN history.downloaded ON main.show.hash = history.downloaded.hash
+            WHERE ({' OR '.join(f'({c})' for c in set_conditions)})
+        """
+        if not include_future:
+            query += "AND show.start < date('now') "
+        query += "ORDER BY show.start "
+        if limit:
+            query += f"LIMIT {limit} "
+
+        cursor = self.connection.cursor()
+        cursor.execute(query, set_arguments + set_arguments)
+        yield from self._items(cursor, fields)
 
     def downloaded(self) -> Iterator["Database.Item"]:
         cursor = self.connection.cursor()
@@ -787,51 +2005,504 @@ class Database(object):
             yield dict(row)  # type: ignore
 
 
-def show_table(shows: Iterable[Database.Item], headers: Optional[List[str]] = None) -> None:
+class Snapshot:
+    """Columnar copy of the show table to answer the common filters without sqlite.
+
+    The rows are ordered by start. Channels, topics and regions are stored as indices into the lists of
+    their distinct values, numbers as fixed width arrays and texts as one blob per field with an array of
+    offsets. The file is memory-mapped and only the values of the selected shows are decoded."""
+
+    MAGIC = b'MTVDLSN1'
+    FIELDS = ('hash', 'channel', 'description', 'region', 'size', 'title', 'topic', 'website', 'new',
+              'url_http', 'url_http_hd', 'url_http_small', 'url_subtitles', 'start', 'duration')
+    INTERNED_FIELDS = ('channel', 'topic', 'region')
+    NUMBER_FIELDS = {'start': 'q', 'duration': 'q', 'size': 'q', 'new': 'b'}
+    TEXT_FIELDS = ('hash', 'description', 'title', 'website', 'url_http', 'url_http_hd', 'url_http_small',
+                   'url_subtitles')
+
+    def __init__(self, snapshot_path: Path) -> None:
+        with snapshot_path.open('rb') as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f'{snapshot_path} is not a snapshot.')
+        header_size = int.from_bytes(self._mmap[len(self.MAGIC):len(self.MAGIC) + 8], 'little')
+        header = json.loads(self._mmap[len(self.MAGIC) + 8:len(self.MAGIC) + 8 + header_size].decode())
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f'{snapshot_path} was written on another platform.')
+
+        self.version: int = header['version']
+        self.rows: int = header['rows']
+        self.values: Dict[str, List[Any]] = header['values']
+        self._view = memoryview(self._mmap)
+        self.sections: Dict[str, memoryview] = {
+            name: self._view[offset:offset + size].cast(typecode)
+            for name, (offset, size, typecode) in header['sections'].items()}
+        # texts are decoded from slices of the file, that is faster than slicing the memory views
+        self._texts = {field: (header['sections'][field][0],
+                               self.sections[f'{field}.offsets'],
+                               self.sections[f'{field}.nulls'])
+                       for field in self.TEXT_FIELDS}
+
+    def close(self) -> None:
+        """Unmap the file (a mapped file can't be replaced on Windows)."""
+        self._texts = {}
+        for section in self.sections.values():
+            section.release()
+        self.sections = {}
+        self._view.release()
+        self._mmap.close()
+
+    @classmethod
+    def write(cls, snapshot_path: Path, connection: sqlite3.Connection, version: int) -> None:
+        interned: Dict[str, Dict[Any, int]] = {f: {} for f in cls.INTERNED_FIELDS}
+        sections: Dict[str, Any] = {}
+        for field in cls.INTERNED_FIELDS:
+            sections[field] = array('i')
+        for field, typecode in cls.NUMBER_FIELDS.items():
+            sections[field] = array(typecode)
+        for field in cls.TEXT_FIELDS:
+            sections[field] = bytearray()
+            sections[f'{field}.offsets'] = array('q', [0])
+            sections[f'{field}.nulls'] = bytearray()
+
+        # numbers are selected as such, that skips the conversion to datetime and timedelta
+        fields = [f for f in cls.FIELDS if f not in ('start', 'duration')] + ['start', 'duration']
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"""
+            SELECT {', '.join(f for f in fields if f not in ('start', 'duration'))},
+                   CAST(strftime('%s', start) AS INTEGER),
+                   CAST(duration AS INTEGER)
+            FROM main.show
+            ORDER BY start, rowid
+        """)
+        while True:
+            rows = cursor.fetchmany(INSERT_BATCH_SIZE)
+            if not rows:
+                break
+            # the values are processed column by column
+            columns = dict(zip(fields, zip(*rows)))
+            for field in cls.INTERNED_FIELDS:
+                sections[field].extend(interned[field].setdefault(v, len(interned[field])) for v in columns[field])
+            for field in cls.NUMBER_FIELDS:
+                sections[field].extend(v or 0 for v in columns[field])
+            for field in cls.TEXT_FIELDS:
+                sections[f'{field}.nulls'].extend(v is None for v in columns[field])
+                encoded = [v.encode() if v is not None else b'' for v in columns[field]]
+                base = len(sections[field])
+                sections[f'{field}.offsets'].extend(base + o for o in accumulate(map(len, encoded)))
+                sections[field] += b''.join(encoded)
+
+        # the sections are aligned to 8 bytes for the typed memory views
+        layout: Dict[str, Tuple[int, int, str]] = {}
+        offset = 0
+        for name, section in sections.items():
+            size = len(section) * (section.itemsize if isinstance(section, array) else 1)
+            layout[name] = (offset, size, section.typecode if isinstance(section, array) else 'B')
+            offset += -(-size // 8) * 8
+        header: Dict[str, Any] = {
+            'version': version,
+            'byteorder': sys.byteorder,
+            'rows': len(sections['start']),
+            'values': {field: list(values) for field, values in interned.items()},
+        }
+        header_size = len(json.dumps(dict(header, sections=layout)).encode())
+        data_offset = -(-(len(cls.MAGIC) + 8 + header_size + 64) // 8) * 8
+        header['sections'] = {name: (data_offset + o, size, typecode) for name, (o, size, typecode) in layout.items()}
+        header_data = json.dumps(header).encode().ljust(data_offset - len(cls.MAGIC) - 8)
 
-    def _escape_cell(title: str, obj: Any) -> str:
-        if title == 'hash':
-            return str(obj)[:11]
-        elif isinstance(obj, datetime):
-            return obj.replace(tzinfo=utc_zone).astimezone(local_zone).isoformat()
-        elif isinstance(obj, timedelta):
-            return str(re.sub(r'(\d+)', r' \1', durationpy.to_str(obj, extended=True)).strip())
-        else:
-            return str(obj)
-
-    headers = headers if isinstance(headers, list) else [
-        'hash',
-        'channel',
-        'title',
-        'topic',
-        'size',
-        'start',
-        'duration',
-        'age',
-        'region',
-        'downloaded']
-
-    # noinspection PyTypeChecker
-    table = Table(box=box.MINIMAL_DOUBLE_HEAD)
-    for h in headers:
-        table.add_column(h)
-    for row in shows:
-        table.add_row(*[_escape_cell(t, row.get(t)) for t in headers])
-    console.print(table)
+        temp_path = snapshot_path.with_name(snapshot_path.name + '.tmp')
+        try:
+            with temp_path.open('wb') as fh:
+                fh.write(cls.MAGIC + len(header_data).to_bytes(8, 'little') + header_data)
+                for name, section in sections.items():
+                    fh.seek(header['sections'][name][0])
+                    fh.write(section.tobytes() if isinstance(section, array) else section)
+            temp_path.replace(snapshot_path)
+        except OSError:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+
+    def _text(self, field: str, index: int) -> Optional[str]:
+        start, offsets, nulls = self._texts[field]
+        if nulls[index]:
+            return None
+        return self._mmap[start + offsets[index]:start + offsets[index + 1]].decode()
+
+    def _item(self, index: int, downloaded: Dict[str, datetime], current_time: datetime) -> "Database.Item":
+        sections, values, text = self.sections, self.values, self._text
+        start = EPOCH + timedelta(seconds=sections['start'][index])
+        show_hash = text('hash', index)
+        return {
+            'hash': show_hash,  # type: ignore
+            'channel': values['channel'][sections['channel'][index]],
+            'description': text('description', index),  # type: ignore
+            'region': values['region'][sections['region'][index]],
+            'size': sections['size'][index],
+            'title': text('title', index),  # type: ignore
+            'topic': values['topic'][sections['topic'][index]],
+            'website': text('website', index),  # type: ignore
+            'new': sections['new'][index],  # type: ignore
+            'url_http': text('url_http', index),
+            'url_http_hd': text('url_http_hd', index),
+            'url_http_small': text('url_http_small', index),
+            'url_subtitles': text('url_subtitles', index),  # type: ignore
+            'start': start,
+            'duration': timedelta(seconds=sections['duration'][index]),
+            # the age is relative to the current time and not to the last database update
+            'age': current_time - start,
+            'downloaded': downloaded.get(show_hash),  # type: ignore
+        }
+
+    def _getters(self,
+                 fields: Iterable[str],
+                 downloaded: Dict[str, datetime],
+                 current_time: datetime) -> List[Tuple[str, Callable[[int], Any]]]:
+        """Functions returning the value of the fields of the show with a given index."""
+        sections, values = self.sections, self.values
+
+        def _interned(field: str) -> Callable[[int], Any]:
+            field_values, indices = values[field], sections[field]
+            return lambda i: field_values[indices[i]]
+
+        def _start(index: int) -> datetime:
+            return EPOCH + timedelta(seconds=sections['start'][index])
+
+        getters: Dict[str, Callable[[int], Any]] = {
+            'size': sections['size'].__getitem__,
+            'new': sections['new'].__getitem__,
+            'start': _start,
+            'duration': lambda i: timedelta(seconds=sections['duration'][i]),
+            # the age is relative to the current time and not to the last database update
+            'age': lambda i: current_time - _start(i),
+            'downloaded': lambda i: downloaded.get(self._text('hash', i)),  # type: ignore
+        }
+        getters.update((field, _interned(field)) for field in self.INTERNED_FIELDS)
+        getters.update((field, partial(self._text, field)) for field in self.TEXT_FIELDS)
+        return [(field, getters[field]) for field in fields if field in getters]
+
+    def select(self,
+               rules: List[Tuple[str, str, str]],
+               include_future: bool,
+               limit: Optional[int],
+               downloaded: Dict[str, datetime],
+               fields: Optional[List[str]] = None) -> Optional[Iterator["Database.Item"]]:
+        """Shows matching the rules like `Database.filtered` (None if a rule can't be answered).
+
+        Only the values of the given fields (all for None) are decoded."""
+        import durationpy
+
+        starts = self.sections['start']
+        first, last = 0, self.rows
+        if not include_future:
+            # shows starting before the current day (UTC)
+            last = bisect_left(starts, int(time.time()) // 86400 * 86400)
+
+        # tests of the numbers and the distinct values come first, they are much cheaper than text searches
+        column_tests: List[Tuple[memoryview, Callable[[Any], bool]]] = []
+        row_tests: List[Callable[[int], bool]] = []
+        comparisons: Dict[str, Callable[[Any, Any], bool]] = {
+            '=': operator.eq,
+            '!=': operator.ne,
+            '+': operator.le,  # value >= pattern
+            '-': operator.ge,  # value <= pattern
+        }
+
+        def _compare(key: Callable[[Any], Any],
+                     compare: Callable[[Any, Any], bool],
+                     value: Any) -> Callable[[Any], bool]:
+            return lambda v: compare(value, key(v))
+
+        def _search(field: str, pattern: str, negate: bool) -> Callable[[int], bool]:
+            return lambda i: sqlite_regexp(pattern, self._text(field, i)) != negate
+
+        for field, rule_operator, pattern in rules:
+            if rule_operator not in comparisons:
+                return None
+            compare = comparisons[rule_operator]
+            negate = rule_operator == '!='
+
+            if field in self.INTERNED_FIELDS and rule_operator in ('=', '!='):
+                # the expression is evaluated once for every distinct value
+                matching = {i for i, v in enumerate(self.values[field]) if sqlite_regexp(pattern, v) != negate}
+                column_tests.append((self.sections[field], matching.__contains__))
+            elif field in self.TEXT_FIELDS and rule_operator in ('=', '!='):
+                row_tests.append(_search(field, pattern, negate))
+            elif field == 'size' and rule_operator in ('=', '!='):
+                sizes = self.sections['size']
+                matching = {v for v in set(sizes[first:last]) if sqlite_regexp(pattern, v) != negate}
+                column_tests.append((sizes, matching.__contains__))
+            elif field in ('size', 'duration'):
+                value = int(pattern) if field == 'size' else durationpy.from_str(pattern).total_seconds()
+                column_tests.append((self.sections[field], partial(compare, value)))
+            elif field == 'age':
+                # a minimal age is a maximal start and vice versa
+                limit_start = (now.replace(tzinfo=None) - durationpy.from_str(pattern) - EPOCH).total_seconds()
+                if rule_operator == '+':
+                    last = min(last, bisect_right(starts, limit_start))
+                elif rule_operator == '-':
+                    first = max(first, bisect_left(starts, limit_start))
+                else:
+                    column_tests.append((starts, partial(compare, limit_start)))
+            elif field == 'dow':
+                # 1970-01-01 was a thursday
+                column_tests.append((starts, _compare(lambda v: (v // 86400 + 4) % 7, compare, int(pattern))))
+            elif field == 'hour':
+                column_tests.append((starts, _compare(lambda v: time.localtime(v).tm_hour, compare, int(pattern))))
+            elif field == 'minute':
+                column_tests.append((starts, _compare(lambda v: v // 60 % 60, compare, int(pattern))))
+            else:
+                return None
+
+        def _select() -> Iterator["Database.Item"]:
+            rows: Iterable[int] = range(first, last)
+            if column_tests:
+                # combined lazily by iterators (without python code for most tests)
+                column, test = column_tests[0]
+                flags = map(test, column[first:last])
+                for column, test in column_tests[1:]:
+                    flags = map(operator.and_, flags, map(test, column[first:last]))
+                rows = compress(rows, flags)
+            if row_tests:
+                rows = (i for i in rows if all(test(i) for test in row_tests))
+            current_time = now.replace(tzinfo=None)
+            if fields is None:
+                for i in islice(rows, limit):
+                    yield self._item(i, downloaded, current_time)
+            else:
+                # slower per value, but the fields not selected aren't decoded at all
+                getters = self._getters(fields, downloaded, current_time)
+                for i in islice(rows, limit):
+                    yield {field: getter(i) for field, getter in getters}  # type: ignore
+
+        return _select()
+
+
+# many shows share start times and durations, so their formatting is cached
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _format_datetime(value: datetime) -> str:
+    return value.replace(tzinfo=utc_zone).astimezone(local_zone()).isoformat()
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _format_timedelta(value: timedelta) -> str:
+    import durationpy
+    return str(re.sub(r'(\d+)', r' \1', durationpy.to_str(value, extended=True)).strip())
+
+
+def _format_cell(title: str, obj: Any) -> str:
+    if title == 'hash':
+        return str(obj)[:11]
+    elif isinstance(obj, datetime):
+        return _format_datetime(obj)
+    elif isinstance(obj, timedelta):
+        return _format_timedelta(obj)
+    elif isinstance(obj, list):
+        return ', '.join(str(o) for o in obj)
+    else:
+        return str(obj)
+
+
+def show_table(shows: Iterable[Database.Item], headers: Optional[List[str]] = None, tsv: bool = False) -> None:
+    """Print the shows as table, page by page (with a header each), or as tab separated values."""
+
+    headers = headers if isinstance(headers, list) else TABLE_HEADERS
+
+    if tsv:
+        def _tsv_cell(title: str, obj: Any) -> str:
+            if obj is None:
+                return ''
+            # the whole hash, scripts may use it to remove a show from the history
+            return TSV_SPECIAL_CHARACTERS.sub(' ', str(obj) if title == 'hash' else _format_cell(title, obj))
+
+        sys.stdout.write('\t'.join(headers) + '\n')
+        for row in shows:
+            sys.stdout.write('\t'.join(_tsv_cell(t, row.get(t)) for t in headers) + '\n')
+        return
+
+    from rich import box
+    from rich.table import Table
+    from rich.text import Text
+
+    # only a page of rows is formatted and rendered at once, the first page is printed without waiting for all
+    # shows (rich measures all rows of a table before printing it)
+    shows = iter(shows)
+    page = list(islice(shows, TABLE_PAGE_SIZE))
+    while True:
+        # noinspection PyTypeChecker
+        table = Table(box=box.MINIMAL_DOUBLE_HEAD)
+        for h in headers:
+            table.add_column(h)
+        for row in page:
+            # text instead of str cells, they aren't parsed for console markup
+            table.add_row(*[Text(_format_cell(t, row.get(t))) for t in headers])
+        get_console().print(table)
+
+        page = list(islice(shows, TABLE_PAGE_SIZE))
+        if not page:
+            break
+
+
+def dump_shows(shows: Iterable[Database.Item], ndjson: bool = False) -> None:
+    """Write the shows as json to stdout, every show as soon as it's read from the database.
+
+    The output is the same as `json.dumps(list(shows), indent=4, sort_keys=True)` (or a compact object
+    per line), without keeping all shows in memory."""
+
+    if ndjson:
+        encoder = json.JSONEncoder(default=serialize_for_json, sort_keys=True)
+        for show in shows:
+            sys.stdout.write(encoder.encode(show) + '\n')
+        return
+
+    # json strings can't contain line breaks, so the shows are indented for the list by their lines
+    encoder = json.JSONEncoder(default=serialize_for_json, indent=4, sort_keys=True)
+    separator = '[\n    '
+    for show in shows:
+        sys.stdout.write(separator + encoder.encode(show).replace('\n', '\n    '))
+        separator = ',\n    '
+    sys.stdout.write('[]\n' if separator.startswith('[') else '\n]\n')
 
 
 class Downloader:
 
     Quality = Literal['url_http', 'url_http_hd', 'url_http_small']
 
-    def __init__(self, show: Database.Item):
+    def __init__(self,
+                 show: Database.Item,
+                 parallel_segments: int = PARALLEL_SEGMENTS,
+                 connections: int = CONNECTIONS_PER_FILE,
+                 min_part_size: int = MIN_PART_SIZE,
+                 split_threshold: int = SPLIT_THRESHOLD):
         self.show = show
+        self.parallel_segments = parallel_segments
+        self.connections = connections
+        self.min_part_size = min_part_size
+        self.split_threshold = split_threshold
 
     @property
     def label(self) -> str:
         return "%(title)r (%(channel)s, %(topic)r, %(start)s, %(hash).11s)" % self.show
 
+    @staticmethod
+    def _read_state(state_file_path: Path) -> Dict[str, Any]:
+        try:
+            with state_file_path.open('r') as fh:
+                state: Dict[str, Any] = json.load(fh)
+                return state
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_state(state_file_path: Path, state: Dict[str, Any]) -> None:
+        temp_state_file_path = state_file_path.with_name(state_file_path.name + '.tmp')
+        with temp_state_file_path.open('w') as fh:
+            json.dump(state, fh)
+        temp_state_file_path.replace(state_file_path)
+
+    @staticmethod
+    def _validator(state: Dict[str, Any]) -> Optional[str]:
+        # weak entity tags can't be used to validate ranges
+        if state.get('etag') and not state['etag'].startswith('W/'):
+            return str(state['etag'])
+        return state.get('last_modified')
+
+    def _open_resumable(self, url: str, offset: int, state: Dict[str, Any]) -> PooledResponse:
+        """Request the data after the offset if the file didn't change, the whole file otherwise."""
+
+        validator = self._validator(state)
+        if not offset or not validator or not state.get('length'):
+            return connection_pool.urlopen(url, timeout=60)
+
+        try:
+            response = connection_pool.urlopen(url, timeout=60, headers={
+                'Range': f'bytes={offset}-',
+                'If-Range': validator})
+        except urllib.error.HTTPError as e:
+            if e.code != 416:
+                raise
+            logger.debug('Range of partial download of %r not satisfiable, starting over.', url)
+            return connection_pool.urlopen(url, timeout=60)
+
+        if response.status == 206 \
+                and response.getheader('content-range') != f'bytes {offset}-{state["length"] - 1}/{state["length"]}':
+            logger.debug('Unexpected range %r for partial download of %r, starting over.',
+                         response.getheader('content-range'), url)
+            response.close()
+            return connection_pool.urlopen(url, timeout=60)
+
+        return response
+
+    @staticmethod
+    def _preallocate(file_path: Path, size: int) -> None:
+        with file_path.open('wb') as fh:
+            try:
+                os.posix_fallocate(fh.fileno(), 0, size)
+            except (AttributeError, OSError):
+                # not available on this platform or file system
+                fh.truncate(size)
+
+    def _download_parts(self,
+                        url: str,
+                        partial_file_path: Path,
+                        state_file_path: Path,
+                        state: Dict[str, Any],
+                        progress: "Progress",
+                        bar_id: "TaskID") -> None:
+        """Download the remaining byte ranges of the parts in parallel right into their place in the file."""
+        import http.client
+
+        parts: List[List[int]] = state['parts']
+        length = state['length']
+        validator = self._validator(state)
+        lock = threading.Lock()
+        failed = threading.Event()
+        last_saved = [time.monotonic()]
+
+        def _fetch(part: List[int], fd: int) -> None:
+            position, end = part
+            headers = {'Range': f'bytes={position}-{end - 1}'}
+            if validator:
+                headers['If-Range'] = validator
+            with connection_pool.urlopen(url, timeout=60, headers=headers) as response:
+                content_range = response.getheader('content-range')
+                if response.status != 206 or content_range != f'bytes {position}-{end - 1}/{length}':
+                    raise OSError(f'Server ignored the range request for bytes {position}-{end - 1}.')
+                while position < end:
+                    if abort_downloads.is_set() or failed.is_set():
+                        raise OSError('Download aborted.')
+                    data = response.read(min(CHUNK_SIZE, end - position))
+                    if not data:
+                        raise http.client.IncompleteRead(b'', end - position)
+                    write_at(fd, data, position)
+                    position += len(data)
+                    with lock:
+                        part[0] = position
+                        progress.update(bar_id, advance=len(data))
+                        # the progress is saved from time to time to resume the download in the next run
+                        if time.monotonic() - last_saved[0] > 1:
+                            self._write_state(state_file_path, state)
+                            last_saved[0] = time.monotonic()
+
+        progress.update(bar_id, advance=length - sum(end - position for position, end in parts))
+        remaining_parts = [part for part in parts if part[0] < part[1]]
+        logger.debug('Downloading %d bytes of %r in %d parts.', length, url, len(remaining_parts))
+        with partial_file_path.open('r+b') as fh, ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            try:
+                for future in as_completed([executor.submit(retry_policy.call, _fetch, part, fh.fileno(),
+                                                            description=f'Download of {url!r} (part {number})')
+                                            for number, part in enumerate(remaining_parts, 1)]):
+                    future.result()
+            except BaseException:
+                failed.set()
+                raise
+            finally:
+                executor.shutdown()
+                self._write_state(state_file_path, state)
+
     def _download_files(self, destination_dir_path: Path, target_urls: List[str]) -> Iterable[Path]:
+        import http.client
 
         file_sizes = []
         with progress_bar() as progress:
@@ -840,30 +2511,167 @@ class Downloader:
 
             for url in target_urls:
 
-                response: http.client.HTTPResponse = urllib.request.urlopen(url, timeout=60)
+                # partial data is kept along with the response details to resume the download in the next run
+                url_hash = hashlib.sha1(url.encode()).hexdigest()
+                partial_file_path = destination_dir_path / f'.{url_hash}.part'
+                state_file_path = destination_dir_path / f'.{url_hash}.json'
+                state = self._read_state(state_file_path)
+                offset = partial_file_path.stat().st_size if state and partial_file_path.exists() else 0
+                if state.get('parts'):
+                    # split downloads are resumed part by part
+                    offset = 0
+
+                # already downloaded completely
+                if state and state['length']:
+                    destination_file_path = destination_dir_path / state['file_name']
+                    if destination_file_path.exists() and destination_file_path.stat().st_size == state['length']:
+                        file_sizes.append(state['length'])
+                        yield destination_file_path
+                        continue
+
+                response = retry_policy.call(self._open_resumable, url, offset, state,
+                                             description=f'Download of {url!r}')
+                if response.status == 206:
+                    logger.debug('Resuming download of %r at %d bytes.', url, offset)
+                else:
+                    # determine file name and destination
+                    default_filename = os.path.basename(url)
+                    file_name = parse_content_disposition(
+                        content_disposition=response.getheader('content-disposition'),
+                        location=response.getheader('content-location')) or default_filename
+                    offset = 0
+                    new_state: Dict[str, Any] = {
+                        'file_name': file_name,
+                        'length': int(response.getheader('content-length') or 0),
+                        'etag': response.getheader('etag'),
+                        'last_modified': response.getheader('last-modified'),
+                    }
+                    if state.get('parts') and partial_file_path.exists() \
+                            and all(state[k] == v for k, v in new_state.items()):
+                        logger.debug('Resuming split download of %r.', url)
+                    else:
+                        state = new_state
+                        if self.connections > 1 \
+                                and response.getheader('accept-ranges') == 'bytes' \
+                                and state['length'] >= max(self.split_threshold, self.min_part_size * 2):
+                            part_count = min(self.connections, state['length'] // self.min_part_size)
+                            part_size = -(-state['length'] // part_count)
+                            state['parts'] = [[start, min(start + part_size, state['length'])]
+                                              for start in range(0, state['length'], part_size)]
+                            self._preallocate(partial_file_path, state['length'])
+                        self._write_state(state_file_path, state)
 
                 # determine file size for progressbar
-                file_sizes.append(int(response.getheader('content-length') or 0))
-                progress.update(bar_id, total=sum(file_sizes) / len(file_sizes) * len(target_urls))
-
-                # determine file name and destination
-                default_filename = os.path.basename(url)
-                file_name = rfc6266.parse_headers(
-                    content_disposition=response.getheader('content-disposition'),
-                    location=response.getheader('content-location')).filename_unsafe or default_filename
-                destination_file_path = destination_dir_path / file_name
-
-                # actual download
-                with destination_file_path.open('wb') as fh:
+                file_sizes.append(state['length'])
+                progress.update(bar_id, total=sum(file_sizes) / len(file_sizes) * len(target_urls), advance=offset)
+
+                if state.get('parts'):
+                    # the parts are requested on connections of their own
+                    response.close()
+                    self._download_parts(url, partial_file_path, state_file_path, state, progress, bar_id)
+                    destination_file_path = destination_dir_path / state['file_name']
+                    partial_file_path.replace(destination_file_path)
+                    yield destination_file_path
+                    continue
+
+                # actual download, an interrupted transfer is continued where it stopped
+                responses = [response]
+
+                def _transfer(fh: BinaryIO) -> None:
+                    if responses:
+                        current = responses.pop()
+                    else:
+                        current = self._open_resumable(url, fh.tell(), state)
+                        if current.status != 206:
+                            progress.update(bar_id, advance=-fh.tell())
+                            fh.seek(0)
+                            fh.truncate()
+                    with current:
+                        while True:
+                            if abort_downloads.is_set():
+                                raise OSError('Download aborted.')
+                            data = current.read(CHUNK_SIZE)
+                            if not data:
+                                break
+                            else:
+                                progress.update(bar_id, advance=len(data))
+                                fh.write(data)
+
+                    # a connection closed early just ends the response
+                    if state['length'] and fh.tell() != state['length']:
+                        raise http.client.IncompleteRead(b'', state['length'] - fh.tell())
+
+                with partial_file_path.open('ab' if offset else 'wb') as fh:
+                    retry_policy.call(_transfer, fh, description=f'Download of {url!r}')
+
+                destination_file_path = destination_dir_path / state['file_name']
+                partial_file_path.replace(destination_file_path)
+                yield destination_file_path
+
+            if progress is shared_progress:
+                progress.remove_task(bar_id)
+
+    def _download_segments(self, destination_file_path: Path, segment_urls: List[str]) -> None:
+        """Download the segments concurrently and write them to the destination file in the given order.
+
+        Only twice as many segments as parallel downloads are allowed to be in flight or waiting for the
+        preceding ones, which limits the memory needed for reordering."""
+
+        def _fetch(url: str) -> bytes:
+            if abort_downloads.is_set():
+                raise OSError('Download aborted.')
+            with connection_pool.urlopen(url, timeout=60) as response:
+                return response.read()
+
+        # the segments already written are recorded to resume the download in the next run
+        state_file_path = destination_file_path.with_name(destination_file_path.name + '.json')
+        state = self._read_state(state_file_path)
+        digest = hashlib.sha1()
+        done = 0
+        if state and destination_file_path.exists() and destination_file_path.stat().st_size >= state['size']:
+            for url in segment_urls[:state['segments']]:
+                digest.update(url.encode())
+            if state['segments'] <= len(segment_urls) and digest.hexdigest() == state['digest']:
+                done = state['segments']
+                logger.debug('Resuming download of %d segments after segment %d.', len(segment_urls), done)
+            else:
+                digest = hashlib.sha1()
+
+        with progress_bar() as progress, ThreadPoolExecutor(max_workers=self.parallel_segments) as executor:
+            bar_id = progress.add_task(
+                total=len(segment_urls),
+                completed=done,
+                description=f'Downloading {self.label}')
+
+            pending: Deque["Future[bytes]"] = deque()
+            remaining_urls = iter(segment_urls[done:])
+            with destination_file_path.open('r+b' if done else 'wb') as fh:
+                if done:
+                    fh.truncate(state['size'])
+                    fh.seek(state['size'])
+                try:
                     while True:
-                        data = response.read(CHUNK_SIZE)
-                        if not data:
+                        for url in islice(remaining_urls, self.parallel_segments * 2 - len(pending)):
+                            pending.append(executor.submit(retry_policy.call, _fetch, url,
+                                                           description=f'Download of segment {url!r}'))
+                        if not pending:
                             break
-                        else:
-                            progress.update(bar_id, advance=len(data))
-                            fh.write(data)
+                        fh.write(pending.popleft().result())
+                        fh.flush()
+                        digest.update(segment_urls[done].encode())
+                        done += 1
+                        self._write_state(state_file_path, {
+                            'segments': done,
+                            'size': fh.tell(),
+                            'digest': digest.hexdigest()})
+                        progress.update(bar_id, advance=1)
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
 
-                yield destination_file_path
+            if progress is shared_progress:
+                progress.remove_task(bar_id)
 
     def _move_to_user_target(self,
                              source_path: Path,
@@ -925,6 +2733,7 @@ class Downloader:
                              temp_dir_path: Path,
                              base_url: str,
                              quality_preference: Tuple[str, str, str]) -> Path:
+        from pydash import py_
 
         hls_index_segments = py_ \
             .chain(m3u8_segments) \
@@ -948,44 +2757,29 @@ class Downloader:
 
         # get stream segments
         hls_target_segments = list(self._get_m3u8_segments(base_url, designated_index_file))
-        hls_target_files = self._download_files(temp_dir_path, list(s['url'] for s in hls_target_segments))
         logger.debug('%d HLS segments to download.', len(hls_target_segments))
 
-        # download and join the segment files
-        temp_file_path = Path(tempfile.mkstemp(dir=temp_dir_path, prefix='.tmp')[1])
-        with temp_file_path.open('wb') as out_fh:
-            for segment_file_path in hls_target_files:
-
-                with segment_file_path.open('rb') as in_fh:
-                    out_fh.write(in_fh.read())
-
-                # delete the segment file immediately to save disk space
-                segment_file_path.unlink()
+        # download the segments right into the joined file
+        temp_file_path = temp_dir_path / '.segments.ts'
+        self._download_segments(temp_file_path, [s['url'] for s in hls_target_segments])
 
         return temp_file_path
 
     def _download_m3u8_target(self, m3u8_segments: List[Dict[str, Any]], temp_dir_path: Path) -> Path:
 
-        # get segments
-        hls_target_files = self._download_files(temp_dir_path, list(s['url'] for s in m3u8_segments))
         logger.debug('%d m3u8 segments to download.', len(m3u8_segments))
 
-        # download and join the segment files
-        temp_file_path = Path(tempfile.mkstemp(dir=temp_dir_path, prefix='.tmp')[1])
-        with temp_file_path.open('wb') as out_fh:
-            for segment_file_path in hls_target_files:
-
-                with segment_file_path.open('rb') as in_fh:
-                    out_fh.write(in_fh.read())
-
-                # delete the segment file immediately to save disk space
-                segment_file_path.unlink()
+        # download the segments right into the joined file
+        temp_file_path = temp_dir_path / '.segments.ts'
+        self._download_segments(temp_file_path, [s['url'] for s in m3u8_segments])
 
         return temp_file_path
 
     @staticmethod
     def _convert_subtitles_xml_to_srt(subtitles_xml_path: Path) -> Path:
 
+        from bs4 import BeautifulSoup
+
         subtitles_srt_path = subtitles_xml_path.parent / (subtitles_xml_path.stem + '.srt')
         soup = BeautifulSoup(subtitles_xml_path.read_text(), "html.parser")
 
@@ -1039,7 +2833,10 @@ class Downloader:
                  include_nfo: bool = True,
                  set_file_modification_date: bool = False
                  ) -> Optional[Path]:
-        temp_path = Path(tempfile.mkdtemp(prefix='.tmp'))
+        # the staging directory of a failed download is kept to resume it in the next run
+        temp_path = cwd / PARTIAL_DOWNLOADS_DIRECTORY / self.show['hash']
+        temp_path.mkdir(parents=True, exist_ok=True)
+        keep_partial_download = False
         try:
 
             # show url based on quality preference
@@ -1051,72 +2848,90 @@ class Downloader:
                 logger.error('No valid url to download %r', self.label)
                 return None
 
-            logger.debug('Downloading %s from %r.', self.label, show_url)
-            show_file_path = list(self._download_files(temp_path, [show_url]))[0]
-            if set_file_modification_date and self.show['start']:
-                os.utime(show_file_path, (self.show['start'].replace(tzinfo=timezone.utc).timestamp(),
-                                          self.show['start'].replace(tzinfo=timezone.utc).timestamp()))
-
-            show_file_name = show_file_path.name
-            if '.' in show_file_name:
-                show_file_extension = show_file_path.suffix
-                show_file_name = show_file_path.stem
-            else:
-                show_file_extension = ''
-
-            if show_file_extension in ('.mp4', '.flv', '.mp3'):
-                final_show_file = self._move_to_user_target(show_file_path, cwd, target,
-                                                            show_file_name, show_file_extension, 'show')
-                if not final_show_file:
-                    return None
+            # the slot limits the number of shows downloaded in parallel from the same server
+            with host_limiter.slot(show_url):
+                logger.debug('Downloading %s from %r.', self.label, show_url)
+                show_file_path = list(self._download_files(temp_path, [show_url]))[0]
+                if set_file_modification_date and self.show['start']:
+                    os.utime(show_file_path, (self.show['start'].replace(tzinfo=timezone.utc).timestamp(),
+                                              self.show['start'].replace(tzinfo=timezone.utc).timestamp()))
+
+                show_file_name = show_file_path.name
+                if '.' in show_file_name:
+                    show_file_extension = show_file_path.suffix
+                    show_file_name = show_file_path.stem
+                else:
+                    show_file_extension = ''
+
+                if show_file_extension in ('.mp4', '.flv', '.mp3'):
+                    final_show_file = self._move_to_user_target(show_file_path, cwd, target,
+                                                                show_file_name, show_file_extension, 'show')
+                    if not final_show_file:
+                        return None
+
+                elif show_file_extension == '.m3u8':
+                    m3u8_segments = list(self._get_m3u8_segments(show_url, show_file_path))
+                    if any('codecs' in s for s in m3u8_segments):
+                        ts_file_path = self._download_hls_target(m3u8_segments, temp_path, show_url, quality)
+                    else:
+                        ts_file_path = self._download_m3u8_target(m3u8_segments, temp_path)
+                    final_show_file = self._move_to_user_target(ts_file_path, cwd, target,
+                                                                show_file_name, '.ts', 'show')
+                    if not final_show_file:
+                        return None
 
-            elif show_file_extension == '.m3u8':
-                m3u8_segments = list(self._get_m3u8_segments(show_url, show_file_path))
-                if any('codecs' in s for s in m3u8_segments):
-                    ts_file_path = self._download_hls_target(m3u8_segments, temp_path, show_url, quality)
                 else:
-                    ts_file_path = self._download_m3u8_target(m3u8_segments, temp_path)
-                final_show_file = self._move_to_user_target(ts_file_path, cwd, target, show_file_name, '.ts', 'show')
-                if not final_show_file:
+                    logger.error('File extension %s of %s not supported.', show_file_extension, self.label)
                     return None
 
-            else:
-                logger.error('File extension %s of %s not supported.', show_file_extension, self.label)
-                return None
-
-            if include_subtitles and self.show['url_subtitles']:
-                logger.debug('Downloading subtitles for %s from %r.', self.label, self.show['url_subtitles'])
-                subtitles_xml_path = list(self._download_files(temp_path, [self.show['url_subtitles']]))[0]
-                subtitles_srt_path = self._convert_subtitles_xml_to_srt(subtitles_xml_path)
-                self._move_to_user_target(subtitles_srt_path, cwd, target, show_file_name, '.srt', 'subtitles')
-
-            if include_nfo:
-                nfo_movie = ET.fromstring('<?xml version="1.0" encoding="UTF-8" standalone="yes" ?><movie/>')
-                nfo_id = ET.SubElement(nfo_movie, 'uniqueid')
-                nfo_id.set('type', 'hash')
-                nfo_id.text = self.show['hash']
-                ET.SubElement(nfo_movie, 'title').text = self.show['title']
-                ET.SubElement(nfo_movie, 'tagline').text = self.show['topic']
-                ET.SubElement(nfo_movie, 'plot').text = self.show['description']
-                ET.SubElement(nfo_movie, 'studio').text = self.show['channel']
-                if self.show['start']:
-                    ET.SubElement(nfo_movie, 'aired').text = self.show['start'].isoformat()
-                ET.SubElement(nfo_movie, 'country').text = self.show['region']
-                nfo_path = Path(tempfile.mkstemp(dir=temp_path, prefix='.tmp')[1])
-                ET.ElementTree(nfo_movie).write(nfo_path.as_posix(), xml_declaration=True, encoding="UTF-8")
-                nfo_path.chmod(0o644)
-                self._move_to_user_target(nfo_path, cwd, target, show_file_name, '.nfo', 'nfo')
-
-            return final_show_file
-
-        except (urllib.error.HTTPError, OSError) as e:
+                if include_subtitles and self.show['url_subtitles']:
+                    logger.debug('Downloading subtitles for %s from %r.', self.label, self.show['url_subtitles'])
+                    subtitles_xml_path = list(self._download_files(temp_path, [self.show['url_subtitles']]))[0]
+                    subtitles_srt_path = self._convert_subtitles_xml_to_srt(subtitles_xml_path)
+                    self._move_to_user_target(subtitles_srt_path, cwd, target, show_file_name, '.srt', 'subtitles')
+
+                if include_nfo:
+                    from xml.etree import ElementTree as ET
+                    nfo_movie = ET.fromstring('<?xml version="1.0" encoding="UTF-8" standalone="yes" ?><movie/>')
+                    nfo_id = ET.SubElement(nfo_movie, 'uniqueid')
+                    nfo_id.set('type', 'hash')
+                    nfo_id.text = self.show['hash']
+                    ET.SubElement(nfo_movie, 'title').text = self.show['title']
+                    ET.SubElement(nfo_movie, 'tagline').text = self.show['topic']
+                    ET.SubElement(nfo_movie, 'plot').text = self.show['description']
+                    ET.SubElement(nfo_movie, 'studio').text = self.show['channel']
+                    if self.show['start']:
+                        ET.SubElement(nfo_movie, 'aired').text = self.show['start'].isoformat()
+                    ET.SubElement(nfo_movie, 'country').text = self.show['region']
+                    nfo_path = Path(tempfile.mkstemp(dir=temp_path, prefix='.tmp')[1])
+                    ET.ElementTree(nfo_movie).write(nfo_path.as_posix(), xml_declaration=True, encoding="UTF-8")
+                    nfo_path.chmod(0o644)
+                    self._move_to_user_target(nfo_path, cwd, target, show_file_name, '.nfo', 'nfo')
+
+                return final_show_file
+
+        except (urllib.error.HTTPError, OSError, RetryLimitExceeded) as e:
             logger.error('Download of %s failed: %s', self.label, e)
+            keep_partial_download = True
+        except BaseException:
+            keep_partial_download = True
+            raise
         finally:
-            shutil.rmtree(temp_path)
+            if not keep_partial_download:
+                shutil.rmtree(temp_path)
 
         return None
 
 
+def purge_partial_downloads(cwd: Path) -> None:
+    """Delete partial downloads which haven't been resumed for a while."""
+    for staging_path in (cwd / PARTIAL_DOWNLOADS_DIRECTORY).glob('*'):
+        last_modified = max([p.stat().st_mtime for p in staging_path.iterdir()] + [staging_path.stat().st_mtime])
+        if datetime.now().timestamp() - last_modified > PARTIAL_DOWNLOADS_MAX_AGE.total_seconds():
+            logger.debug('Removing outdated partial download %r.', staging_path)
+            shutil.rmtree(staging_path)
+
+
 def run_post_download_hook(executable: Path, item: Database.Item, downloaded_file: Path) -> None:
     try:
         subprocess.run([executable.as_posix()],
@@ -1148,6 +2963,7 @@ def load_config(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
     config_file_path = (Path(arguments['--config']) if arguments['--config'] else DEFAULT_CONFIG_FILE).expanduser()
 
+    import yaml
     try:
         config = yaml.safe_load(config_file_path.open())
 
@@ -1156,7 +2972,7 @@ def load_config(arguments: Dict[str, Any]) -> Dict[str, Any]:
             logger.error('Config file file defined but not loaded: %s', e)
             sys.exit(1)
 
-    except YAMLError as e:
+    except yaml.YAMLError as e:
         logger.error('Unable to read config file: %s', e)
         sys.exit(1)
 
@@ -1179,6 +2995,18 @@ def load_config(arguments: Dict[str, Any]) -> Dict[str, Any]:
     return arguments
 
 
+def positive_option(arguments: Dict[str, Any], option: str) -> int:
+    """Value of an option expecting a count or size of at least 1."""
+    try:
+        value = int(arguments[option])
+    except (TypeError, ValueError):
+        value = 0
+    if value < 1:
+        raise ConfigurationError(f'Invalid value {arguments[option]!r} for {option} (expected a number of at '
+                                 f'least 1).')
+    return value
+
+
 def main() -> None:
 
     # argument handling
@@ -1195,10 +3023,6 @@ def main() -> None:
     if sys.stderr.encoding != 'UTF-8':
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')  # type: ignore
 
-    # rfc6266 logger fix (don't expect an upstream fix for that)
-    for logging_handler in rfc6266.LOGGER.handlers:
-        rfc6266.LOGGER.removeHandler(logging_handler)
-
     # mute third party modules              1
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("rfc6266").setLevel(logging.WARNING)
@@ -1208,13 +3032,12 @@ def main() -> None:
 
     # ISO8601 logger
     if arguments['--logfile']:
-        logging_handler = logging.FileHandler(Path(arguments['--logfile']).expanduser())
+        logging_handler: logging.Handler = logging.FileHandler(Path(arguments['--logfile']).expanduser())
         logging_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-8s %(message)s",
                                                        "%Y-%m-%dT%H:%M:%S%z"))
     else:
-        logging_handler = RichHandler(console=console)
+        logging_handler = ConsoleLogHandler()
         logging_handler.setFormatter(logging.Formatter(datefmt="%Y-%m-%dT%H:%M:%S%z "))
-        logging_handler._log_render.show_path = False
 
     logger.addHandler(logging_handler)
     sys.excepthook = lambda _c, _e, _t: logger.critical('%s: %s\n%s', _c, _e, ''.join(traceback.format_tb(_t)))
@@ -1236,10 +3059,23 @@ def main() -> None:
     cw_dir.mkdir(parents=True, exist_ok=True)
     tempfile.tempdir = cw_dir.as_posix()
 
+    retry_policy.retries = int(arguments['--retries'])
+    retry_policy.delay = float(arguments['--retry-delay'])
+
     try:
+        rate_limiter.configure(arguments['--limit-rate'])
+        parallel_downloads = positive_option(arguments, '--parallel')
+        parallel_per_host = positive_option(arguments, '--parallel-per-host')
+        parallel_segments = positive_option(arguments, '--parallel-segments')
+        connections = positive_option(arguments, '--connections')
+        min_part_size = positive_option(arguments, '--min-part-size') * 1024 * 1024
         showlist = Database(filmliste=cw_dir / FILMLISTE_DATABASE_FILE,
-                            history=cw_dir / HISTORY_DATABASE_FILE)
-        showlist.initialize_if_old(refresh_after=int(arguments['--refresh-after']))
+                            history=cw_dir / HISTORY_DATABASE_FILE,
+                            snapshot=arguments['--snapshot'],
+                            parse_processes=int(arguments['--parse-processes']),
+                            profile=arguments['--database-profile'])
+        showlist.initialize_if_old(refresh_after=int(arguments['--refresh-after']),
+                                   full_refresh_after=int(arguments['--full-refresh-after']))
 
         if arguments['history']:
             if arguments['--reset']:
@@ -1247,56 +3083,116 @@ def main() -> None:
             elif arguments['--remove']:
                 showlist.remove_from_downloaded(show_hash=arguments['--remove'])
             else:
-                show_table(showlist.downloaded())
+                show_table(showlist.downloaded(), tsv=arguments['--tsv'])
 
         else:
 
             limit = int(arguments['--count']) if arguments['list'] else None
-            shows = chain(*(showlist.filtered(rules=filter_set,
-                                              include_future=arguments['--include-future'],
-                                              limit=limit or None)
-                            for filter_set
-                            in showlist.read_filter_sets(sets_file_path=(Path(arguments['--sets'])
-                                                                         if arguments['--sets'] else None),
-                                                         default_filter=arguments['<filter>'])))
+            # only the fields shown are read from the database (downloads need all of them)
+            fields = [f.strip() for f in arguments['--fields'].split(',')] if arguments['--fields'] else None
+            if arguments['list']:
+                fields = list(fields or TABLE_HEADERS)
+                if arguments['--single-pass'] and 'sets' not in fields:
+                    fields.append('sets')
+            elif arguments['download']:
+                fields = None
+            filter_sets = showlist.read_filter_sets(sets_file_path=(Path(arguments['--sets'])
+                                                                    if arguments['--sets'] else None),
+                                                    default_filter=arguments['<filter>'])
+            if arguments['--single-pass']:
+                shows: Iterable[Database.Item] = showlist.filtered_sets(
+                    rule_sets=filter_sets,
+                    include_future=arguments['--include-future'],
+                    limit=limit or None,
+                    fields=fields)
+            else:
+                shows = chain(*(showlist.filtered(rules=filter_set,
+                                                  include_future=arguments['--include-future'],
+                                                  limit=limit or None,
+                                                  fields=fields)
+                                for filter_set in filter_sets))
             if arguments['list']:
-                show_table(shows)
+                show_table(shows, headers=fields, tsv=arguments['--tsv'])
 
             elif arguments['dump']:
-                print(json.dumps(list(shows), default=serialize_for_json, indent=4, sort_keys=True))
+                dump_shows(shows, ndjson=arguments['--ndjson'])
 
             elif arguments['download']:
-                for item in shows:
-                    downloader = Downloader(item)
-                    if not downloader.show.get('downloaded') or arguments['--oblivious']:
-                        if not arguments['--mark-only']:
-                            if arguments['--high']:
-                                quality_preference = ('url_http_hd', 'url_http', 'url_http_small')
-                            elif arguments['--low']:
-                                quality_preference = ('url_http_small', 'url_http', 'url_http_hd')
+                if arguments['--high']:
+                    quality_preference = ('url_http_hd', 'url_http', 'url_http_small')
+                elif arguments['--low']:
+                    quality_preference = ('url_http_small', 'url_http', 'url_http_hd')
+                else:
+                    quality_preference = ('url_http', 'url_http_hd', 'url_http_small')
+
+                purge_partial_downloads(cw_dir)
+                host_limiter.limit = parallel_per_host
+                with ThreadPoolExecutor(max_workers=parallel_downloads) as executor, ExitStack() as stack:
+                    downloads: Dict["Future[Optional[Path]]", Database.Item] = {}
+                    seen_hashes = set()
+                    try:
+                        # the shared display has to exist before the first worker asks for a progress bar
+                        if parallel_downloads > 1:
+                            progress = stack.enter_context(shared_progress_bar())
+                            bar_id = progress.add_task(total=0, description='Downloading 0 shows')
+
+                        for item in shows:
+                            downloader = Downloader(
+                                item,
+                                parallel_segments=parallel_segments,
+                                connections=connections,
+                                min_part_size=min_part_size,
+                                split_threshold=int(arguments['--split-threshold']) * 1024 * 1024)
+                            if item['hash'] in seen_hashes:
+                                continue
+                            seen_hashes.add(item['hash'])
+                            if not downloader.show.get('downloaded') or arguments['--oblivious']:
+                                if not arguments['--mark-only']:
+                                    downloads[executor.submit(
+                                        downloader.download,
+                                        quality_preference,  # type: ignore
+                                        cw_dir, target_dir,
+                                        include_subtitles=not arguments['--no-subtitles'],
+                                        include_nfo=not arguments['--no-nfo'],
+                                        set_file_modification_date=arguments['--set-file-mod-time'])] = item
+                                    if shared_progress is not None:
+                                        shared_progress.update(bar_id, total=len(downloads),
+                                                               description=f'Downloading {len(downloads)} shows')
+                                else:
+                                    showlist.add_to_downloaded(downloader.show)
+                                    logger.info('Marked %s as downloaded.', downloader.label)
                             else:
-                                quality_preference = ('url_http', 'url_http_hd', 'url_http_small')
-                            downloaded_file = downloader.download(
-                                quality_preference,  # type: ignore
-                                cw_dir, target_dir,
-                                include_subtitles=not arguments['--no-subtitles'],
-                                include_nfo=not arguments['--no-nfo'],
-                                set_file_modification_date=arguments['--set-file-mod-time'])
+                                logger.debug('Skipping %s (already loaded on %s)', downloader.label, item['downloaded'])
+
+                        if shared_progress is not None and not downloads:
+                            shared_progress.remove_task(bar_id)
+
+                        # the history and the post download hook are handled one after another
+                        for future in as_completed(downloads):
+                            item = downloads[future]
+                            downloaded_file = future.result()
                             if downloaded_file:
                                 showlist.add_to_downloaded(item)
                                 if arguments['--post-download']:
                                     executable = Path(arguments['--post-download']).expanduser()
                                     run_post_download_hook(executable, item, downloaded_file)
-                        else:
-                            showlist.add_to_downloaded(downloader.show)
-                            logger.info('Marked %s as downloaded.', downloader.label)
-                    else:
-                        logger.debug('Skipping %s (already loaded on %s)', downloader.label, item['downloaded'])
+                            if shared_progress is not None:
+                                shared_progress.update(bar_id, advance=1)
+
+                    except BaseException:
+                        abort_downloads.set()
+                        for future in downloads:
+                            future.cancel()
+                        raise
 
     except ConfigurationError as e:
         logger.error(str(e))
     except KeyboardInterrupt:
         pass
+    finally:
+        if connection_pool.requests:
+            logger.debug('%d HTTP requests served over %d connections.',
+                         connection_pool.requests, connection_pool.connections)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,70 @@
+# coding: utf-8
+
+"""Tests of the word search operator (~) with and without the full text index."""
+
+import operator
+import sys
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+import pytest
+
+sys.path.insert(0, Path(__file__).absolute().parent.parent.as_posix())
+
+import mtv_dl  # noqa: E402
+
+# records in the order of Database.FILMLISTE_COLUMNS
+RECORDS = [
+    ['ARD', 'Krimi', '', 'Tatort: Geänderter Plan', '500', '1577836800', '01:30:00', 'Ein Fall für zwei',
+     '', 'false', 'https://example.org/1.mp4', '', '', ''],
+    ['', 'Satire', '', 'Extra 3 Spezial', '300', '1577840400', '00:45:00', 'Satire',
+     '', 'false', 'https://example.org/2.mp4', '', '', ''],
+]
+
+
+class ListDatabase(mtv_dl.Database):
+    """Database with the shows of RECORDS instead of the downloaded Filmliste."""
+
+    def _get_shows(self, url: str) -> Iterator[Tuple[Any, ...]]:
+        rows, _ = self._show_rows(operator.itemgetter(*range(len(self.FILMLISTE_COLUMNS))), RECORDS, ('', '', ''))
+        yield from rows
+
+
+class RegexpDatabase(ListDatabase):
+    """Same, but searching words without the full text index."""
+
+    @property
+    def has_full_text_index(self) -> bool:
+        return False
+
+
+@pytest.fixture(params=[ListDatabase, RegexpDatabase], ids=['fts', 'regexp'])
+def database(request: Any, tmp_path: Path) -> Iterator[mtv_dl.Database]:
+    mtv_dl.HIDE_PROGRESSBAR = True
+    database = request.param(filmliste=tmp_path / 'filmliste.db', history=tmp_path / 'history.db')
+    yield database
+    database.connection.close()
+
+
+def titles(database: mtv_dl.Database, rules: List[str]) -> List[str]:
+    return sorted(item['title'] for item in database.filtered(rules, include_future=True))
+
+
+@pytest.mark.parametrize('rules, expected', [
+    (['title~extra 3'], ['Extra 3 Spezial']),
+    (['title~geänd*'], ['Tatort: Geänderter Plan']),
+    (['title~geand*'], []),
+    (['topic~krimi'], ['Tatort: Geänderter Plan']),
+    (['title!~tatort'], ['Extra 3 Spezial']),
+])
+def test_word_search(database: mtv_dl.Database, rules: List[str], expected: List[str]) -> None:
+    assert titles(database, rules) == expected
+
+
+@pytest.mark.parametrize('rule', ['title~', 'title~*', 'title~ * ', 'description!~'])
+def test_empty_word_search(database: mtv_dl.Database, rule: str) -> None:
+    with pytest.raises(mtv_dl.ConfigurationError):
+        titles(database, [rule])